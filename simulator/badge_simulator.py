@@ -7,12 +7,23 @@ Run GitHub Badger 2350 games locally via Pygame by simulating the
 """
 
 import argparse
+import functools
+import hashlib
 import importlib.util
 import json
 import math
 import os
+import queue
+import random
+import struct
 import sys
+import threading
+import time
 import traceback
+import tracemalloc
+import weakref
+from collections import OrderedDict
+from io import BytesIO
 from types import ModuleType
 
 try:
@@ -22,6 +33,18 @@ except ImportError:
         "Pygame is required to run the local simulator. Install with: pip install pygame"
     )
 
+try:
+    import numpy as _np  # type: ignore
+except ImportError:
+    # Optional: shape vertices are transformed in pure Python without it
+    _np = None
+
+try:
+    from PIL import Image as _PILImage  # type: ignore
+except ImportError:
+    # Optional: only needed to record GIFs with --record-video
+    _PILImage = None
+
 # -----------------------------------------------------------------------------
 # Virtual “/system” mapping (NO filesystem changes)
 # -----------------------------------------------------------------------------
@@ -165,17 +188,79 @@ sys.path = _SafePathList(sys.path)
 # Badgeware API stubs
 # -----------------------------------------------------------------------------
 
+# Unit-shape vertex caches: the trig for a given set of shape parameters is
+# computed once, and each draw only scales and offsets the cached samples.
+
+@functools.lru_cache(maxsize=256)
+def _unit_circle(segments: int) -> tuple:
+    return tuple(
+        (math.cos((2.0 * math.pi * i) / segments), math.sin((2.0 * math.pi * i) / segments))
+        for i in range(segments)
+    )
+
+
+@functools.lru_cache(maxsize=256)
+def _unit_squircle(n: float, segments: int) -> tuple:
+    pts = []
+    exponent = 2.0 / max(1e-3, float(n))
+    for i in range(segments):
+        theta = (2.0 * math.pi * i) / segments
+        cos_t = math.cos(theta)
+        sin_t = math.sin(theta)
+        pts.append((
+            math.copysign(abs(cos_t) ** exponent, cos_t),
+            math.copysign(abs(sin_t) ** exponent, sin_t),
+        ))
+    return tuple(pts)
+
+
+@functools.lru_cache(maxsize=1024)
+def _unit_arc(start_deg: float, span_deg: float, segments: int) -> tuple:
+    """(cos, sin) samples from start_deg through start_deg + span_deg inclusive."""
+    return tuple(
+        (math.cos(angle), math.sin(angle))
+        for angle in (
+            math.radians(start_deg + span_deg * (step / segments))
+            for step in range(segments + 1)
+        )
+    )
+
+
+@functools.lru_cache(maxsize=1024)
+def _unit_array(unit_func, *args):
+    """Read-only NumPy copy of one of the cached unit-shape sample tables."""
+    arr = _np.array(unit_func(*args), dtype=_np.float64)
+    arr.flags.writeable = False
+    return arr
+
+
+@functools.lru_cache(maxsize=256)
+def _unit_polygon(sides: int) -> tuple:
+    """(sin, cos) samples, matching the badge's polygon orientation."""
+    return tuple(
+        (math.sin(math.radians((360.0 / sides) * i)), math.cos(math.radians((360.0 / sides) * i)))
+        for i in range(sides)
+    )
+
+
 class _Shape:
     """Base shape that supports optional affine transforms."""
 
     __slots__ = ("transform",)
 
+    # Shapes with enough vertices to be worth transforming with NumPy
+    VECTORIZE = False
+
     def __init__(self) -> None:
         self.transform = None  # optional Matrix
 
     def points(self):
         raise NotImplementedError
 
+    def points_array(self):
+        """Vertices as an (N, 2) float array; only used when NumPy is available."""
+        return _np.asarray(self.points(), dtype=_np.float64).reshape(-1, 2)
+
     def stroke(self, width: float):
         return _StrokedShape(self, width)
 
@@ -211,6 +296,8 @@ class _Rectangle(_Shape):
 class _RoundedRectangle(_Rectangle):
     __slots__ = ("radii",)
 
+    VECTORIZE = True
+
     def __init__(self, x: float, y: float, w: float, h: float, radius: float, *corner_radii) -> None:
         super().__init__(x, y, w, h)
         if corner_radii:
@@ -252,41 +339,36 @@ class _RoundedRectangle(_Rectangle):
                 continue
 
             segments = max(4, int(radius * 2))
-            for step in range(segments + 1):
-                if idx > 0 and step == 0:
-                    continue
-                t = step / segments
-                angle = math.radians(start_deg + (end_deg - start_deg) * t)
-                px = cx + radius * math.cos(angle)
-                py = cy + radius * math.sin(angle)
-                points.append((px, py))
+            unit = _unit_arc(start_deg, end_deg - start_deg, segments)
+            if idx > 0:
+                unit = unit[1:]
+            points.extend([(cx + radius * c, cy + radius * s) for c, s in unit])
         return points
 
 
 class _Circle(_Shape):
     __slots__ = ("x", "y", "radius", "segments")
 
+    VECTORIZE = True
+
     def __init__(self, x: float, y: float, radius: float, segments: int = 32) -> None:
         super().__init__()
         self.x, self.y, self.radius = x, y, radius
         self.segments = max(12, int(segments))
 
     def points(self):
-        pts = []
-        for i in range(self.segments):
-            theta = (2.0 * math.pi * i) / self.segments
-            pts.append(
-                (
-                    self.x + self.radius * math.cos(theta),
-                    self.y + self.radius * math.sin(theta),
-                )
-            )
-        return pts
+        x, y, r = self.x, self.y, self.radius
+        return [(x + r * c, y + r * s) for c, s in _unit_circle(self.segments)]
+
+    def points_array(self):
+        return _unit_array(_unit_circle, self.segments) * self.radius + (self.x, self.y)
 
 
 class _Squircle(_Shape):
     __slots__ = ("x", "y", "radius", "n", "segments")
 
+    VECTORIZE = True
+
     def __init__(self, x: float, y: float, radius: float, n: float = 4.0, segments: int = 64) -> None:
         super().__init__()
         self.x, self.y, self.radius = x, y, radius
@@ -294,16 +376,11 @@ class _Squircle(_Shape):
         self.segments = max(24, int(segments))
 
     def points(self):
-        pts = []
-        exponent = 2.0 / max(1e-3, float(self.n))
-        for i in range(self.segments):
-            theta = (2.0 * math.pi * i) / self.segments
-            cos_t = math.cos(theta)
-            sin_t = math.sin(theta)
-            px = self.radius * math.copysign(abs(cos_t) ** exponent, cos_t)
-            py = self.radius * math.copysign(abs(sin_t) ** exponent, sin_t)
-            pts.append((self.x + px, self.y + py))
-        return pts
+        x, y, r = self.x, self.y, self.radius
+        return [(x + r * ux, y + r * uy) for ux, uy in _unit_squircle(self.n, self.segments)]
+
+    def points_array(self):
+        return _unit_array(_unit_squircle, self.n, self.segments) * self.radius + (self.x, self.y)
 
 
 class _Line(_Shape):
@@ -324,19 +401,15 @@ class _RegularPolygon(_Shape):
         self.sides = max(3, int(sides))
 
     def points(self):
-        pts = []
-        for i in range(self.sides):
-            angle_deg = (360.0 / self.sides) * i
-            angle = math.radians(angle_deg)
-            px = self.x + self.radius * math.sin(angle)
-            py = self.y + self.radius * math.cos(angle)
-            pts.append((px, py))
-        return pts
+        x, y, r = self.x, self.y, self.radius
+        return [(x + r * s, y + r * c) for s, c in _unit_polygon(self.sides)]
 
 
 class _Arc(_Shape):
     __slots__ = ("x", "y", "radius", "start_deg", "end_deg", "thickness")
 
+    VECTORIZE = True
+
     def __init__(self, x: float, y: float, radius: float, start_deg: float, end_deg: float, thickness: float = 1.0) -> None:
         super().__init__()
         self.x, self.y, self.radius = x, y, radius
@@ -344,21 +417,22 @@ class _Arc(_Shape):
         self.end_deg = float(end_deg)
         self.thickness = max(1.0, float(thickness))
 
-    def points(self):
+    def _sweep(self):
         start = self.start_deg
         end = self.end_deg
         if end < start:
             end += 360.0
         span = max(0.0, end - start)
         segments = max(8, int(self.radius * max(1.0, span / 45.0)))
-        pts = []
-        for i in range(segments + 1):
-            t = i / segments if segments else 0.0
-            angle = math.radians(start + span * t)
-            px = self.x + self.radius * math.sin(angle)
-            py = self.y + self.radius * math.cos(angle)
-            pts.append((px, py))
-        return pts
+        return start, span, segments
+
+    def points(self):
+        x, y, r = self.x, self.y, self.radius
+        # Arcs sweep with sin on x and cos on y, so the cached (cos, sin) pairs are swapped
+        return [(x + r * s, y + r * c) for c, s in _unit_arc(*self._sweep())]
+
+    def points_array(self):
+        return _unit_array(_unit_arc, *self._sweep())[:, ::-1] * self.radius + (self.x, self.y)
 
     def stroke(self, width: float):
         stroked = _Arc(self.x, self.y, self.radius, self.start_deg, self.end_deg, width)
@@ -379,12 +453,38 @@ class _Pie(_Arc):
             return [(self.x, self.y)] + pts
         return [(self.x, self.y)]
 
+    def points_array(self):
+        return _np.vstack(((self.x, self.y), super().points_array()))
+
+
+def _screen_points(shape, transform, ox, oy):
+    """Transform a shape's vertices, add the window offset and round to pixels.
+
+    Shapes with many vertices go through NumPy when it is installed; the
+    arithmetic is done in the same order as the Python path (including
+    round-half-to-even) so both produce identical pixels.
+    """
+    if _np is not None and shape.VECTORIZE:
+        pts = shape.points_array()
+        if isinstance(transform, Matrix):
+            xs = pts[:, 0]
+            ys = pts[:, 1]
+            out = _np.empty_like(pts)
+            out[:, 0] = transform.a * xs + transform.c * ys + transform.tx
+            out[:, 1] = transform.b * xs + transform.d * ys + transform.ty
+            out += (ox, oy)
+        else:
+            out = pts + (ox, oy)
+        return _np.rint(out).astype(_np.intp).tolist()
 
-def _round_points(points):
-    return [(int(round(px)), int(round(py))) for px, py in points]
+    points = shape.points()
+    if isinstance(transform, Matrix):
+        points = [transform.transformed_point(px, py) for px, py in points]
+    return [(int(round(px + ox)), int(round(py + oy))) for px, py in points]
 
 
 def _render_shape(surface, color, shape, transform=None, offset=(0.0, 0.0)):
+    """Draw a shape and return the pygame.Rect it touched (None if nothing was drawn)."""
     base_shape = shape
     stroke_width = None
 
@@ -406,76 +506,194 @@ def _render_shape(surface, color, shape, transform=None, offset=(0.0, 0.0)):
             x1, y1 = transform.transformed_point(x1, y1)
             x2, y2 = transform.transformed_point(x2, y2)
         width = stroke_width if stroke_width is not None else base_shape.thickness
-        pygame.draw.line(
+        return pygame.draw.line(
             surface,
             color,
             (int(round(x1 + ox)), int(round(y1 + oy))),
             (int(round(x2 + ox)), int(round(y2 + oy))),
             max(1, int(round(width))),
         )
-        return
 
     if isinstance(base_shape, _Pie):
-        points = base_shape.points()
-        if isinstance(transform, Matrix):
-            points = [transform.transformed_point(px, py) for px, py in points]
-        points = [(px + ox, py + oy) for px, py in points]
+        points = _screen_points(base_shape, transform, ox, oy)
         if not points:
-            return
+            return None
         if stroke_width is not None and stroke_width > 0:
-            pygame.draw.polygon(
+            return pygame.draw.polygon(
                 surface,
                 color,
-                _round_points(points),
+                points,
                 max(1, int(round(stroke_width))),
             )
-        else:
-            pygame.draw.polygon(surface, color, _round_points(points))
-        return
+        return pygame.draw.polygon(surface, color, points)
 
     if isinstance(base_shape, _Arc):
-        points = base_shape.points()
-        if isinstance(transform, Matrix):
-            points = [transform.transformed_point(px, py) for px, py in points]
-        points = [(px + ox, py + oy) for px, py in points]
+        points = _screen_points(base_shape, transform, ox, oy)
         if len(points) >= 2:
             width = stroke_width if stroke_width is not None else base_shape.thickness
-            pygame.draw.lines(
+            return pygame.draw.lines(
                 surface,
                 color,
                 False,
-                _round_points(points),
+                points,
                 max(1, int(round(width))),
             )
-        return
+        return None
 
     if not hasattr(base_shape, "points"):
-        return
+        return None
 
-    points = list(base_shape.points())
+    points = _screen_points(base_shape, transform, ox, oy)
     if not points:
-        return
-
-    if isinstance(transform, Matrix):
-        points = [transform.transformed_point(px, py) for px, py in points]
-    points = [(px + ox, py + oy) for px, py in points]
+        return None
 
     if stroke_width is not None and stroke_width > 0:
-        pygame.draw.polygon(
+        return pygame.draw.polygon(
             surface,
             color,
-            _round_points(points),
+            points,
             max(1, int(round(stroke_width))),
         )
-    else:
-        pygame.draw.polygon(surface, color, _round_points(points))
+    return pygame.draw.polygon(surface, color, points)
+
+
+class _TextCache:
+    """Bounded LRU of rendered text surfaces plus a cache of text metrics.
+
+    Most apps draw the same labels (scores, headers, menu entries) every
+    frame, so rendering is keyed by font, string and colour. `.ppf` pixel
+    fonts skip render(): text() blits their glyphs straight from the atlas.
+    """
+
+    def __init__(self, max_surfaces: int = 256, max_metrics: int = 1024) -> None:
+        self.max_surfaces = max_surfaces
+        self.max_metrics = max_metrics
+        self._surfaces = OrderedDict()
+        self._metrics = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.metric_hits = 0
+        self.metric_misses = 0
+
+    def render(self, font, text: str, color) -> pygame.Surface:
+        key = (font, text, color)
+        surf = self._surfaces.get(key)
+        if surf is not None:
+            self._surfaces.move_to_end(key)
+            self.hits += 1
+            return surf
+        self.misses += 1
+        surf = font.render(text, True, color)
+        self._surfaces[key] = surf
+        if len(self._surfaces) > self.max_surfaces:
+            self._surfaces.popitem(last=False)
+        return surf
+
+    def size(self, font, text: str) -> tuple:
+        key = (font, text)
+        size = self._metrics.get(key)
+        if size is not None:
+            self._metrics.move_to_end(key)
+            self.metric_hits += 1
+            return size
+        self.metric_misses += 1
+        if hasattr(font, "size"):
+            size = tuple(font.size(text))
+        else:
+            size = font.render(text, True, (0, 0, 0)).get_size()
+        self._metrics[key] = size
+        if len(self._metrics) > self.max_metrics:
+            self._metrics.popitem(last=False)
+        return size
+
+    def hit_rate(self) -> float:
+        """Percentage of text() and measure_text() calls served from the cache."""
+        hits = self.hits + self.metric_hits
+        total = hits + self.misses + self.metric_misses
+        return (hits / total * 100.0) if total else 0.0
+
+    def clear(self) -> None:
+        self._surfaces.clear()
+        self._metrics.clear()
+
+
+_text_cache = _TextCache()
+
+
+class _ScaleCache:
+    """Bounded LRU of scaled/flipped copies of Image surfaces for scale_blit.
+
+    Entries are keyed by source surface identity, target size and flip flags.
+    Sources are held weakly, and writes to an Image invalidate its entries.
+    """
+
+    def __init__(self, max_entries: int = 128) -> None:
+        self.max_entries = max_entries
+        self._entries = OrderedDict()  # (id, w, h, flip_x, flip_y) -> (weakref, scaled)
+        self._by_surface = {}          # id(source) -> set of keys
+        self.hits = 0
+        self.misses = 0
+
+    def scaled(self, src: pygame.Surface, w: int, h: int) -> pygame.Surface:
+        key = (id(src), max(1, abs(w)), max(1, abs(h)), w < 0, h < 0)
+        entry = self._entries.get(key)
+        if entry is not None and entry[0]() is src:
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[1]
+        self.misses += 1
+        scaled = pygame.transform.scale(src, (key[1], key[2]))
+        if key[3] or key[4]:
+            scaled = pygame.transform.flip(scaled, key[3], key[4])
+        self._entries[key] = (weakref.ref(src), scaled)
+        self._by_surface.setdefault(key[0], set()).add(key)
+        if len(self._entries) > self.max_entries:
+            old_key, _ = self._entries.popitem(last=False)
+            self._forget(old_key)
+        return scaled
+
+    def _forget(self, key) -> None:
+        keys = self._by_surface.get(key[0])
+        if keys is not None:
+            keys.discard(key)
+            if not keys:
+                del self._by_surface[key[0]]
+
+    def invalidate(self, src: pygame.Surface) -> None:
+        """Drop cached scales of a surface that is about to be drawn into."""
+        keys = self._by_surface.pop(id(src), None)
+        if keys:
+            for key in keys:
+                self._entries.pop(key, None)
+
+    def clear(self) -> None:
+        self._entries.clear()
+        self._by_surface.clear()
+
+
+_scale_cache = _ScaleCache()
+
+
+def _scaled_source(image, w: int, h: int) -> pygame.Surface:
+    """Scale (and flip for negative sizes) an image for scale_blit."""
+    if isinstance(image, Image):
+        return _scale_cache.scaled(image._surface, w, h)
+    src = image
+    scaled = pygame.transform.scale(src, (max(1, abs(w)), max(1, abs(h))))
+    if w < 0 or h < 0:
+        scaled = pygame.transform.flip(scaled, w < 0, h < 0)
+    return scaled
 
 
 class _SurfaceTarget:
-    __slots__ = ("_surface", "brush", "font", "antialias")
+    # Drawing methods return None like the badge's; the pygame.Rect each one
+    # touched is left in _last_rect so DrawProfiler and DeviceCostModel can
+    # count pixels, and Screen collects them as dirty regions.
+    __slots__ = ("_surface", "brush", "font", "antialias", "_last_rect")
 
     def __init__(self, surface: pygame.Surface):
         self._surface = surface
+        self._last_rect = None
         self.brush = brushes.color(255, 255, 255)
         self.font = pygame.font.Font(None, 14)
         self.antialias = 0
@@ -490,44 +708,41 @@ class _SurfaceTarget:
     def _unwrap(self, image):
         return image._surface if isinstance(image, Image) else image
 
+    def _written(self, rect) -> None:
+        # Every write to this surface (and its windows) reports its rect here;
+        # Screen extends it to collect dirty regions for present()
+        self._last_rect = rect
+
     def clear(self, color=None) -> None:
         fill_color = self._norm_color(color if color is not None else self.brush)
-        self._surface.fill(fill_color)
+        self._written(self._surface.fill(fill_color))
 
     def draw(self, shape: _Shape) -> None:
         color = self._norm_color(self.brush)
-        _render_shape(self._surface, color, shape)
+        self._written(_render_shape(self._surface, color, shape))
 
     def blit(self, image, x: float, y: float, transform: "Matrix" = None) -> None:
         if isinstance(transform, Matrix):
             x, y = transform.transformed_point(x, y)
-        self._surface.blit(self._unwrap(image), (int(round(x)), int(round(y))))
+        self._written(self._surface.blit(self._unwrap(image), (int(round(x)), int(round(y)))))
 
     def scale_blit(self, image, x: float, y: float, w: int, h: int, transform: "Matrix" = None) -> None:
         if isinstance(transform, Matrix):
             x, y = transform.transformed_point(x, y)
-        src = self._unwrap(image)
-        new_w = max(1, abs(w))
-        new_h = max(1, abs(h))
-        scaled = pygame.transform.scale(src, (new_w, new_h))
-        if w < 0:
-            scaled = pygame.transform.flip(scaled, True, False)
-        if h < 0:
-            scaled = pygame.transform.flip(scaled, False, True)
-        self._surface.blit(scaled, (int(round(x)), int(round(y))))
+        scaled = _scaled_source(image, w, h)
+        self._written(self._surface.blit(scaled, (int(round(x)), int(round(y)))))
 
     def text(self, text: str, x: float, y: float) -> None:
         font = self.font
         color = self._norm_color(self.brush)
-        surf = font.render(str(text), True, color)
-        self._surface.blit(surf, (int(round(x)), int(round(y))))
+        if isinstance(font, _PixelFontAtlas):
+            self._written(font.draw(self._surface, str(text), int(round(x)), int(round(y)), color))
+            return
+        surf = _text_cache.render(font, str(text), color)
+        self._written(self._surface.blit(surf, (int(round(x)), int(round(y)))))
 
     def measure_text(self, text: str) -> tuple:
-        font = self.font
-        if hasattr(font, "size"):
-            return font.size(str(text))
-        surf = font.render(str(text), True, (0, 0, 0))
-        return surf.get_size()
+        return _text_cache.size(self.font, str(text))
 
     def window(self, x: float, y: float, width: float, height: float):
         return _Window(self, x, y, width, height)
@@ -587,6 +802,137 @@ class brushes:
         return brushes.color(r, g, b, a)
 
 
+class _PixelFontAtlas:
+    """A `.ppf` pixel font rasterised once into a glyph atlas surface.
+
+    File layout (big-endian): ``b"ppf!"``, u32 flags, u16 glyph count,
+    u16 glyph box width, u16 glyph box height, 32-byte name, then one
+    (u32 codepoint, u16 advance) entry per glyph, then each glyph's bitmap
+    as ``height`` rows of ``ceil(width / 8)`` bytes, MSB first.
+    """
+
+    _HEADER = struct.Struct(">4sIHHH32s")
+    _ENTRY = struct.Struct(">IH")
+    _ATLAS_COLUMNS = 32
+    _MAX_TINTS = 16
+    _cache = {}  # resolved path -> _PixelFontAtlas
+
+    __slots__ = ("name", "height", "_box_width", "_glyphs", "_atlas", "_tints", "_fallback")
+
+    def __init__(self, data: bytes, name: str) -> None:
+        magic, _flags, count, box_w, box_h, _label = self._HEADER.unpack_from(data, 0)
+        if magic != b"ppf!":
+            raise ValueError("not a ppf font")
+        row_bytes = (box_w + 7) // 8
+        glyph_bytes = row_bytes * box_h
+        table = self._HEADER.size
+        bitmaps = table + count * self._ENTRY.size
+        if len(data) < bitmaps + count * glyph_bytes:
+            raise ValueError("truncated ppf font")
+
+        self.name = name
+        self.height = box_h
+        self._box_width = box_w
+        self._glyphs = {}  # codepoint -> (atlas area, advance)
+        self._tints = {}   # colour -> tinted copy of the atlas
+
+        cols = self._ATLAS_COLUMNS
+        rows = (count + cols - 1) // cols
+        atlas = pygame.Surface((cols * box_w, max(1, rows) * box_h), pygame.SRCALPHA)
+        atlas.fill((255, 255, 255, 0))
+        white = (255, 255, 255, 255)
+        for index in range(count):
+            codepoint, advance = self._ENTRY.unpack_from(data, table + index * self._ENTRY.size)
+            gx = (index % cols) * box_w
+            gy = (index // cols) * box_h
+            offset = bitmaps + index * glyph_bytes
+            for row in range(box_h):
+                start = offset + row * row_bytes
+                bits = int.from_bytes(data[start:start + row_bytes], "big")
+                if not bits:
+                    continue
+                top = row_bytes * 8 - 1
+                for col in range(box_w):
+                    if bits >> (top - col) & 1:
+                        atlas.set_at((gx + col, gy + row), white)
+            self._glyphs[codepoint] = (pygame.Rect(gx, gy, box_w, box_h), advance)
+
+        # Space is stored with a zero advance; give it a sensible gap
+        space = self._glyphs.get(32)
+        if space is not None and space[1] == 0:
+            self._glyphs[32] = (space[0], max(2, box_w // 3))
+        self._fallback = self._glyphs.get(ord("?"))
+        self._atlas = atlas
+
+    @classmethod
+    def load(cls, resolved: str, name: str) -> "_PixelFontAtlas":
+        """Parse a `.ppf` file, reusing the atlas if it was already built."""
+        font = cls._cache.get(resolved)
+        if font is None:
+            with open(resolved, "rb") as fh:
+                font = cls(fh.read(), name)
+            cls._cache[resolved] = font
+        return font
+
+    def _glyph(self, ch):
+        return self._glyphs.get(ord(ch), self._fallback)
+
+    def _tinted(self, color):
+        atlas = self._tints.get(color)
+        if atlas is None:
+            if len(self._tints) >= self._MAX_TINTS:
+                self._tints.pop(next(iter(self._tints)))
+            atlas = self._atlas.copy()
+            atlas.fill(color, special_flags=pygame.BLEND_RGBA_MULT)
+            self._tints[color] = atlas
+        return atlas
+
+    def size(self, text: str) -> tuple:
+        """Width and height of the text in pixels."""
+        width = 0
+        lines = text.split("\n")
+        for line in lines:
+            line_width = 0
+            for ch in line:
+                glyph = self._glyph(ch)
+                if glyph is not None:
+                    line_width += glyph[1]
+            width = max(width, line_width)
+        return (width, self.height * len(lines))
+
+    def get_height(self) -> int:
+        return self.height
+
+    def draw(self, surface: pygame.Surface, text: str, x: int, y: int, color) -> pygame.Rect:
+        """Blit the text's glyphs from the atlas; returns the touched rect."""
+        atlas = self._tinted(tuple(color))
+        jobs = []
+        cx = x
+        for ch in text:
+            if ch == "\n":
+                cx = x
+                y += self.height
+                continue
+            glyph = self._glyph(ch)
+            if glyph is None:
+                continue
+            area, advance = glyph
+            jobs.append((atlas, (cx, y), area))
+            cx += advance
+        if not jobs:
+            return None
+        rects = surface.blits(jobs)
+        return rects[0].unionall(rects[1:])
+
+    def render(self, text: str, antialias: bool = False, color=(255, 255, 255, 255), background=None):
+        """pygame.font.Font-compatible render into a new surface."""
+        surf = pygame.Surface(self.size(text), pygame.SRCALPHA)
+        if background is not None:
+            surf.fill(background)
+        self.draw(surf, text, 0, 0, color)
+        return surf
+
+
 class PixelFont:
     class _Wrapper:
         __slots__ = ("_font", "name", "height")
@@ -620,10 +966,12 @@ class PixelFont:
                     font = pygame.font.Font(resolved, size)
                 except Exception:
                     font = None
-            else:
-                # Pico pixel fonts (`.ppf`) aren't true TTF files; using the
-                # default pygame font keeps the simulator stable.
-                font = None
+            elif ext == ".ppf":
+                try:
+                    font = _PixelFontAtlas.load(resolved, name)
+                except (OSError, ValueError, struct.error) as e:
+                    print(f"[Simulator] Could not parse pixel font {path}: {e}")
+                    font = None
         if font is None:
             font = pygame.font.Font(None, size)
         
@@ -631,16 +979,132 @@ class PixelFont:
         if _perf_monitor and _perf_monitor.enabled:
             _perf_monitor.asset_tracker.register_font(resolved)
         
+        if isinstance(font, _PixelFontAtlas):
+            return font
         return PixelFont._Wrapper(font, name)
 
 
+class _ImageCache:
+    """Decoded-image cache that models the badge's RAM.
+
+    Each entry is charged its on-device size (4 bytes/pixel for RGBA, 1 byte/pixel
+    plus a 1 KB palette for paletted images). With a budget set, loading an image
+    evicts least-recently-used entries that no Image still uses; if the images
+    still in use do not leave room, MemoryError is raised like on the badge.
+    Copies an Image makes of a shared surface before modifying it are charged
+    too, until the Image is garbage collected.
+    """
+
+    def __init__(self, budget_bytes: int = None) -> None:
+        self.budget_bytes = budget_bytes
+        self.total_bytes = 0
+        # Most decoded-image memory in use at once since the last clear(). Cached
+        # images nothing references are left out: a budget would evict them first.
+        self.peak_bytes = 0
+        self._entries = OrderedDict()  # path -> [surface, cost]
+        self._generation = 0  # bumped by clear() so older copies are not released twice
+
+    @staticmethod
+    def device_cost(raw: pygame.Surface) -> int:
+        """Bytes the badge needs for a decoded image (before convert_alpha)."""
+        width, height = raw.get_size()
+        if raw.get_bitsize() <= 8:
+            return width * height + 256 * 4
+        return width * height * 4
+
+    @staticmethod
+    def _pinned(entry) -> bool:
+        # Referenced by anything besides this entry (an Image, a sprite subsurface...)
+        return sys.getrefcount(entry[0]) > 2
+
+    def __contains__(self, path) -> bool:
+        return path in self._entries
+
+    def in_use_bytes(self) -> int:
+        """Bytes of cached images something still references, plus charged copies."""
+        return self.total_bytes - sum(entry[1] for entry in self._entries.values() if not self._pinned(entry))
+
+    def update_peak(self) -> None:
+        self.peak_bytes = max(self.peak_bytes, self.in_use_bytes())
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, path):
+        entry = self._entries.get(path)
+        if entry is None:
+            return None
+        self._entries.move_to_end(path)
+        return entry[0]
+
+    def reserve(self, cost: int) -> None:
+        """Make room for `cost` bytes, evicting unused images; raise MemoryError if impossible."""
+        if self.budget_bytes is None:
+            return
+        if self.total_bytes + cost > self.budget_bytes:
+            for path in list(self._entries):
+                if self.total_bytes + cost <= self.budget_bytes:
+                    break
+                if not self._pinned(self._entries[path]):
+                    self.evict(path)
+        if self.total_bytes + cost > self.budget_bytes:
+            raise MemoryError(
+                f"memory allocation failed, allocating {cost} bytes "
+                f"({self.total_bytes // 1024}KB of {self.budget_bytes // 1024}KB in use)"
+            )
+
+    def put(self, path, surface: pygame.Surface, cost: int) -> None:
+        self._entries[path] = [surface, cost]
+        self.total_bytes += cost
+
+    def charge_copy(self, owner, surface: pygame.Surface) -> None:
+        """Charge the copy `owner` made of a shared surface until `owner` is collected."""
+        cost = _ImageCache.device_cost(surface)
+        self.reserve(cost)
+        self.total_bytes += cost
+        self.update_peak()
+        key = f"<copy {id(owner):x}>"
+        if _perf_monitor and _perf_monitor.enabled:
+            width, height = surface.get_size()
+            _perf_monitor.asset_tracker.register_image(key, width, height, cost)
+        weakref.finalize(owner, self._release_copy, key, cost, self._generation)
+
+    def _release_copy(self, key, cost: int, generation: int) -> None:
+        if generation == self._generation:
+            self.total_bytes -= cost
+            if _perf_monitor and _perf_monitor.enabled:
+                _perf_monitor.asset_tracker.unregister_image(key)
+
+    def evict(self, path) -> None:
+        entry = self._entries.pop(path, None)
+        if entry is None:
+            return
+        self.total_bytes -= entry[1]
+        if _perf_monitor and _perf_monitor.enabled:
+            _perf_monitor.asset_tracker.unregister_image(path)
+
+    def clear(self) -> None:
+        self._entries.clear()
+        self.total_bytes = 0
+        self.peak_bytes = 0
+        self._generation += 1
+
+
 class Image(_SurfaceTarget):
     OFF = 0
     X2 = 1
     X4 = 2
-    _cache = {}
+    _cache = _ImageCache()
+    # Surface copies skipped by Image.load() sharing cached surfaces (copy-on-write)
+    copies_avoided = 0
+
+    # pygame.Surface methods reached through __getattr__ that modify pixels or alpha
+    _SURFACE_WRITES = frozenset((
+        "fill", "set_at", "set_alpha", "set_colorkey", "blit", "blits", "fblits",
+        "scroll", "set_palette", "set_palette_at", "lock", "get_view", "get_buffer",
+    ))
 
-    def __init__(self, *args, _surface: pygame.Surface = None):
+    def __init__(self, *args, _surface: pygame.Surface = None, _shared: bool = False):
         if _surface is None:
             if len(args) == 2:
                 width, height = args
@@ -657,6 +1121,10 @@ class Image(_SurfaceTarget):
             height = surface.get_height()
 
         super().__init__(surface)
+        # A shared surface belongs to a cache (Image.load) or a sprite sheet and
+        # is copied the first time this image is drawn into or has its alpha changed.
+        self._shared = _shared
+        self._counted = False
         self.width = width
         self.height = height
         self.antialias = Image.OFF
@@ -672,8 +1140,46 @@ class Image(_SurfaceTarget):
 
     @alpha.setter
     def alpha(self, value):
+        self._own()
         self._surface.set_alpha(None if value is None else int(value))
 
+    def _own(self):
+        """Prepare to modify: copy a shared surface and drop stale scaled copies."""
+        if self._shared:
+            copy = self._surface.copy()
+            Image._cache.charge_copy(self, copy)
+            self._surface = copy
+            self._shared = False
+            if self._counted:
+                Image.copies_avoided -= 1
+                self._counted = False
+        else:
+            _scale_cache.invalidate(self._surface)
+
+    def clear(self, color=None) -> None:
+        self._own()
+        super().clear(color)
+
+    def draw(self, shape: _Shape) -> None:
+        self._own()
+        super().draw(shape)
+
+    def blit(self, image, x: float, y: float, transform: "Matrix" = None) -> None:
+        self._own()
+        super().blit(image, x, y, transform)
+
+    def scale_blit(self, image, x: float, y: float, w: int, h: int, transform: "Matrix" = None) -> None:
+        self._own()
+        super().scale_blit(image, x, y, w, h, transform)
+
+    def text(self, text: str, x: float, y: float) -> None:
+        self._own()
+        super().text(text, x, y)
+
+    def window(self, x: float, y: float, width: float, height: float):
+        self._own()
+        return super().window(x, y, width, height)
+
     def get_width(self):
         return self.width
 
@@ -681,23 +1187,32 @@ class Image(_SurfaceTarget):
         return self.height
 
     def __getattr__(self, item):
+        if item in Image._SURFACE_WRITES:
+            self._own()
         return getattr(self._surface, item)
 
     @staticmethod
     def load(path: str):
         normalised = os.path.normpath(map_system_path(path))
-        if normalised in Image._cache:
-            source = Image._cache[normalised]
-        else:
-            source = pygame.image.load(normalised).convert_alpha()
-            Image._cache[normalised] = source
+        source = Image._cache.get(normalised)
+        if source is None:
+            raw = pygame.image.load(normalised)
+            cost = _ImageCache.device_cost(raw)
+            Image._cache.reserve(cost)
+            source = raw.convert_alpha()
+            Image._cache.put(normalised, source, cost)
             
             # Track asset loading for performance monitoring
             if _perf_monitor and _perf_monitor.enabled:
                 width, height = source.get_size()
-                _perf_monitor.asset_tracker.register_image(normalised, width, height)
+                _perf_monitor.asset_tracker.register_image(normalised, width, height, cost)
         
-        return Image(_surface=source.copy())
+        # Share the cached surface; it is only copied if the caller modifies the image
+        image = Image(_surface=source, _shared=True)
+        image._counted = True
+        Image.copies_avoided += 1
+        Image._cache.update_peak()
+        return image
 
 
 class SpriteSheet:
@@ -707,8 +1222,25 @@ class SpriteSheet:
         self.rows = rows
         self.frame_width = self.sheet.get_width() // cols
         self.frame_height = self.sheet.get_height() // rows
+        # Slice every frame once as a subsurface view of the sheet (no pixel copies)
+        src = self.sheet._surface
+        self._frames = [
+            [
+                Image(_surface=src.subsurface(pygame.Rect(
+                    col * self.frame_width,
+                    row * self.frame_height,
+                    self.frame_width,
+                    self.frame_height,
+                )), _shared=True)
+                for col in range(cols)
+            ]
+            for row in range(rows)
+        ]
 
     def sprite(self, x: int, y: int) -> Image:
+        if 0 <= x < self.cols and 0 <= y < self.rows:
+            return self._frames[y][x]
+        # Out-of-range frames keep the old behaviour: a (blank) copied surface
         rect = pygame.Rect(
             x * self.frame_width,
             y * self.frame_height,
@@ -806,19 +1338,73 @@ class Matrix:
 
 
 class Screen(_SurfaceTarget):
-    def __init__(self, width: int = 160, height: int = 120, scale: int = 4, screenshot_dir: str = None) -> None:
+    def __init__(self, width: int = 160, height: int = 120, scale: int = 4, screenshot_dir: str = None,
+                 headless: bool = False) -> None:
         self.width = width
         self.height = height
         self.scale = scale
         self.screenshot_dir = screenshot_dir
+        self.headless = headless
         self._screenshot_counter = 0
-        # Add space below for keyboard hints (30 pixels)
-        self._window = pygame.display.set_mode((width * scale, height * scale + 30))
+        if headless:
+            # Offscreen driver still needs a display surface for convert_alpha()
+            self._window = pygame.display.set_mode((width, height))
+        else:
+            # Add space below for keyboard hints (30 pixels)
+            self._window = pygame.display.set_mode((width * scale, height * scale + 30))
         pygame.display.set_caption("Badge Local Simulator")
         surface = pygame.Surface((width, height), pygame.SRCALPHA)
         super().__init__(surface)
         self.antialias = Image.OFF
         self._hint_font = pygame.font.Font(None, 16)
+        # Dirty-rectangle presentation: writes report their rects through
+        # _written(), present() upscales only those into a preallocated
+        # window-sized copy and pushes just the changed regions
+        self._dirty_rects = []
+        self._full_redraw = True
+        self._last_frame = None
+        self._scaled = None
+        self._hint_bar = None
+        if not headless:
+            # Opaque like the device framebuffer: translucent screen pixels show
+            # their colour rather than blending with whatever was presented before
+            self._scaled = pygame.Surface((width * scale, height * scale))
+            self._hint_bar = self._render_hint_bar()
+
+    # Beyond this many rects per frame, merge them into their bounding box
+    MAX_DIRTY_RECTS = 16
+
+    def _written(self, rect) -> None:
+        self._last_rect = rect
+        if rect is not None:
+            dirty = self._dirty_rects
+            dirty.append(rect)
+            if len(dirty) > self.MAX_DIRTY_RECTS:
+                self._dirty_rects = [dirty[0].unionall(dirty[1:])]
+
+    def invalidate(self) -> None:
+        """Force the next present() to redraw the whole window."""
+        self._full_redraw = True
+
+    def _render_hint_bar(self) -> pygame.Surface:
+        # Keyboard hints below the screen never change: render them once
+        hint_bg = (40, 40, 40)
+        hint_text = (200, 200, 200)
+        bar = pygame.Surface((self.width * self.scale, 30))
+        bar.fill(hint_bg)
+        
+        hints = [
+            ("Z/A: A", 10),
+            ("X/B: B", 100),
+            ("Space/C: C", 180),
+            ("Arrows: D-pad", 300),
+            ("H/Esc: Home", 450)
+        ]
+        
+        for hint, x_pos in hints:
+            text_surf = self._hint_font.render(hint, True, hint_text)
+            bar.blit(text_surf, (x_pos, 8))
+        return bar
     
     def set_icon(self, icon_path: str) -> None:
         """Set the application icon (displayed in dock/taskbar)."""
@@ -838,7 +1424,7 @@ class Screen(_SurfaceTarget):
         src = self._unwrap(image)
         if src.get_width() != self.width or src.get_height() != self.height:
             src = pygame.transform.scale(src, (self.width, self.height))
-        self._surface.blit(src, (0, 0))
+        self._written(self._surface.blit(src, (0, 0)))
 
     def window(self, x: float, y: float, width: float, height: float):
         return _Window(self, x, y, width, height)
@@ -857,42 +1443,165 @@ class Screen(_SurfaceTarget):
         filepath = os.path.join(self.screenshot_dir, filename)
         self._screenshot_counter += 1
         
-        # Save the native resolution surface (not the scaled version)
-        pygame.image.save(self._surface, filepath)
-        print(f"Screenshot saved: {filepath}")
+        # Save the native resolution surface (not the scaled version) off the event loop
+        _capture.screenshot(self._surface, filepath)
 
     def present(self) -> None:
-        # Scale and blit the game screen to a temporary surface
-        scaled_game = pygame.transform.scale(
-            self._surface, (self.width * self.scale, self.height * self.scale)
-        )
-        
-        # Blit the scaled game to the window
-        self._window.blit(scaled_game, (0, 0))
-        
-        # Draw keyboard hints below the screen
-        y_offset = self.height * self.scale
-        hint_bg = (40, 40, 40)
-        hint_text = (200, 200, 200)
-        
-        # Fill the hint area with dark background
-        hint_rect = pygame.Rect(0, y_offset, self.width * self.scale, 30)
-        pygame.draw.rect(self._window, hint_bg, hint_rect)
-        
-        # Draw the hint text
-        hints = [
-            ("Z/A: A", 10),
-            ("X/B: B", 100),
-            ("Space/C: C", 180),
-            ("Arrows: D-pad", 300),
-            ("H/Esc: Home", 450)
-        ]
-        
-        for hint, x_pos in hints:
-            text_surf = self._hint_font.render(hint, True, hint_text)
-            self._window.blit(text_surf, (x_pos, y_offset + 8))
-        
-        pygame.display.flip()
+        dirty = self._dirty_rects
+        self._dirty_rects = []
+        # Nothing to show in headless mode; skip the window scaling entirely
+        if self.headless:
+            return
+
+        # Apps usually clear and redraw everything each frame; if the pixels
+        # came out identical there is nothing to upscale or push at all
+        frame = pygame.image.tobytes(self._surface, "RGBA")
+        if frame == self._last_frame and not self._full_redraw:
+            return
+        self._last_frame = frame
+
+        scale = self.scale
+        # Pixels changed without a tracked write (or the window was exposed):
+        # fall back to pushing the whole frame
+        if self._full_redraw or not dirty:
+            self._full_redraw = False
+            pygame.transform.scale(self._surface, self._scaled.get_size(), self._scaled)
+            self._window.blit(self._scaled, (0, 0))
+            self._window.blit(self._hint_bar, (0, self.height * scale))
+            pygame.display.flip()
+            return
+
+        bounds = self._surface.get_rect()
+        updates = []
+        for rect in dirty:
+            rect = rect.clip(bounds)
+            if not rect.width or not rect.height:
+                continue
+            target = pygame.Rect(rect.x * scale, rect.y * scale, rect.width * scale, rect.height * scale)
+            pygame.transform.scale(
+                self._surface.subsurface(rect), target.size, self._scaled.subsurface(target)
+            )
+            self._window.blit(self._scaled, target, target)
+            updates.append(target)
+        if updates:
+            pygame.display.update(updates)
+
+
+class _CaptureWriter:
+    """Encode screenshots and recorded frames on a background thread.
+
+    The main thread only copies pixels: a screenshot copies the surface and a
+    recorded frame copies its RGB bytes into a queue of at most `max_frames`
+    frames. When the encoder falls that far behind, new frames are dropped
+    (and counted) rather than stalling the frame loop. Frames are written as a
+    numbered PNG sequence, or collected into a GIF (needs Pillow) on close().
+    Pillow needs every GIF frame in memory to write the file, so a GIF keeps at
+    most MAX_GIF_FRAMES frames and counts the rest as cut.
+    """
+    
+    MAX_GIF_FRAMES = 3600  # one minute at 60 fps, about 70 MB of 160x120 frames
+    
+    def __init__(self, max_frames: int = 120) -> None:
+        self.max_frames = max_frames
+        self.video_path = None
+        self.captured = 0
+        self.dropped = 0
+        self.cut = 0
+        self._jobs = queue.Queue()
+        self._queued_frames = 0
+        self._lock = threading.Lock()
+        self._thread = None
+        self._gif_frames = []
+        self._gif_ticks = []
+    
+    @property
+    def recording(self) -> bool:
+        return self.video_path is not None
+    
+    def start_video(self, path: str) -> None:
+        """Record every presented frame to `path` (a .gif file or a PNG directory)."""
+        self.video_path = path
+        if not path.lower().endswith(".gif"):
+            os.makedirs(path, exist_ok=True)
+    
+    def _put(self, job) -> None:
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._work, name="capture-writer", daemon=True)
+            self._thread.start()
+        self._jobs.put(job)
+    
+    def screenshot(self, surface: pygame.Surface, path: str) -> None:
+        self._put(("screenshot", surface.copy(), path))
+    
+    def capture(self, surface: pygame.Surface, ticks: int) -> None:
+        """Queue the frame just presented, or drop it if the encoder is behind."""
+        index = self.captured + self.dropped + self.cut
+        if self.captured >= self.MAX_GIF_FRAMES and self.video_path.lower().endswith(".gif"):
+            if not self.cut:
+                print(f"[Simulator] GIF reached {self.MAX_GIF_FRAMES} frames; "
+                      "record to a PNG directory for longer captures")
+            self.cut += 1
+            return
+        with self._lock:
+            if self._queued_frames >= self.max_frames:
+                self.dropped += 1
+                return
+            self._queued_frames += 1
+        self.captured += 1
+        self._put(("frame", pygame.image.tobytes(surface, "RGB"), surface.get_size(), index, ticks))
+    
+    def _work(self) -> None:
+        while True:
+            job = self._jobs.get()
+            if job is None:
+                return
+            try:
+                if job[0] == "screenshot":
+                    _, surface, path = job
+                    pygame.image.save(surface, path)
+                    print(f"Screenshot saved: {path}")
+                else:
+                    self._encode(*job[1:])
+            except Exception:
+                traceback.print_exc()
+            finally:
+                if job[0] == "frame":
+                    with self._lock:
+                        self._queued_frames -= 1
+    
+    def _encode(self, data, size, index, ticks) -> None:
+        if self.video_path.lower().endswith(".gif"):
+            frame = _PILImage.frombytes("RGB", size, data).quantize(256)
+            self._gif_frames.append(frame)
+            self._gif_ticks.append(ticks)
+        else:
+            frame = pygame.image.frombytes(data, size, "RGB")
+            pygame.image.save(frame, os.path.join(self.video_path, f"frame_{index:05d}.png"))
+    
+    def close(self) -> None:
+        """Finish every queued job and write the GIF, if recording one."""
+        if self._thread is not None:
+            self._jobs.put(None)
+            self._thread.join()
+            self._thread = None
+        if not self.recording:
+            return
+        if self._gif_frames:
+            # Each frame lasts until the next kept frame, so dropped frames keep real timing
+            ticks = self._gif_ticks
+            durations = [max(10, later - earlier) for earlier, later in zip(ticks, ticks[1:])]
+            durations.append(durations[-1] if durations else 100)
+            first, rest = self._gif_frames[0], self._gif_frames[1:]
+            first.save(self.video_path, save_all=True, append_images=rest,
+                       duration=durations, loop=0, disposal=1)
+            self._gif_frames = []
+        print(f"[Simulator] Recorded {self.captured} frames to {self.video_path}"
+              + (f" ({self.dropped} dropped: encoder fell behind)" if self.dropped else "")
+              + (f" ({self.cut} cut: GIF frame limit)" if self.cut else ""))
+        self.video_path = None
+
+
+_capture = _CaptureWriter()
 
 
 class _Window:
@@ -904,8 +1613,17 @@ class _Window:
         self.height = max(0, int(round(height)))
         self.brush = parent.brush
         self.font = parent.font
+        self._last_rect = None
+
+    def _written(self, rect) -> None:
+        self._last_rect = rect
+        self._parent._written(rect)
 
     def _set_clip(self):
+        # Every window write goes through here: let an Image parent copy its
+        # shared surface or drop stale scaled copies first
+        if isinstance(self._parent, Image):
+            self._parent._own()
         prev = self._parent._surface.get_clip()
         rect = pygame.Rect(self.x, self.y, self.width, self.height)
         self._parent._surface.set_clip(rect)
@@ -914,12 +1632,12 @@ class _Window:
     def _restore_clip(self, prev):
         self._parent._surface.set_clip(prev)
 
-    def clear(self, color=None):
+    def clear(self, color=None) -> None:
         clip = self._set_clip()
         try:
             fill_color = self._parent._norm_color(color if color is not None else self.brush)
             rect = pygame.Rect(self.x, self.y, self.width, self.height)
-            self._parent._surface.fill(fill_color, rect)
+            self._written(self._parent._surface.fill(fill_color, rect))
         finally:
             self._restore_clip(clip)
 
@@ -927,7 +1645,7 @@ class _Window:
         color = self._parent._norm_color(self.brush)
         clip = self._set_clip()
         try:
-            _render_shape(self._parent._surface, color, shape, offset=(self.x, self.y))
+            self._written(_render_shape(self._parent._surface, color, shape, offset=(self.x, self.y)))
         finally:
             self._restore_clip(clip)
 
@@ -940,10 +1658,10 @@ class _Window:
         clip = self._set_clip()
         try:
             x, y = self._offset(x, y, transform)
-            self._parent._surface.blit(
+            self._written(self._parent._surface.blit(
                 self._parent._unwrap(image),
                 (int(x), int(y)),
-            )
+            ))
         finally:
             self._restore_clip(clip)
 
@@ -951,15 +1669,8 @@ class _Window:
         clip = self._set_clip()
         try:
             x, y = self._offset(x, y, transform)
-            src = self._parent._unwrap(image)
-            new_w = max(1, abs(w))
-            new_h = max(1, abs(h))
-            scaled = pygame.transform.scale(src, (new_w, new_h))
-            if w < 0:
-                scaled = pygame.transform.flip(scaled, True, False)
-            if h < 0:
-                scaled = pygame.transform.flip(scaled, False, True)
-            self._parent._surface.blit(scaled, (int(x), int(y)))
+            scaled = _scaled_source(image, w, h)
+            self._written(self._parent._surface.blit(scaled, (int(x), int(y))))
         finally:
             self._restore_clip(clip)
 
@@ -967,20 +1678,29 @@ class _Window:
         clip = self._set_clip()
         try:
             font = self.font or self._parent.font
-            surf = font.render(str(text), True, self._parent._norm_color(self.brush))
-            self._parent._surface.blit(surf, (int(x + self.x), int(y + self.y)))
+            color = self._parent._norm_color(self.brush)
+            if isinstance(font, _PixelFontAtlas):
+                self._written(font.draw(self._parent._surface, str(text), int(x + self.x), int(y + self.y), color))
+                return
+            surf = _text_cache.render(font, str(text), color)
+            self._written(self._parent._surface.blit(surf, (int(x + self.x), int(y + self.y))))
         finally:
             self._restore_clip(clip)
 
     def measure_text(self, text: str) -> tuple:
-        font = self.font or self._parent.font
-        surf = font.render(str(text), True, (0, 0, 0))
-        return surf.get_size()
+        return _text_cache.size(self.font or self._parent.font, str(text))
 
     def window(self, x: float, y: float, width: float, height: float):
         return _Window(self._parent, self.x + x, self.y + y, width, height)
 
 
+# Window events after which the whole window must be redrawn, not just dirty rects
+_EXPOSE_EVENTS = tuple(
+    getattr(pygame, name) for name in ("VIDEOEXPOSE", "WINDOWEXPOSED", "WINDOWRESTORED", "WINDOWSIZECHANGED")
+    if hasattr(pygame, name)
+)
+
+
 class IO:
     BUTTON_A = "BUTTON_A"
     BUTTON_B = "BUTTON_B"
@@ -991,7 +1711,7 @@ class IO:
     BUTTON_RIGHT = "BUTTON_RIGHT"
     BUTTON_HOME = "BUTTON_HOME"
 
-    def __init__(self) -> None:
+    def __init__(self, tick_step_ms: float = None) -> None:
         self.pressed: set = set()
         self.down: set = set()
         self.released: set = set()
@@ -999,7 +1719,13 @@ class IO:
         self.held: set = set()
         self.ticks = 0
         self.ticks_delta = 0
-        self._last_ticks = pygame.time.get_ticks()
+        # Virtual clock: advance ticks by a fixed step per frame instead of wall-clock time
+        self.tick_step_ms = tick_step_ms
+        self._virtual_ticks = 0.0
+        if tick_step_ms is not None:
+            self._last_ticks = 0
+        else:
+            self._last_ticks = pygame.time.get_ticks()
         self._key_map = {
             pygame.K_a: IO.BUTTON_A,
             pygame.K_b: IO.BUTTON_B,
@@ -1014,37 +1740,183 @@ class IO:
             pygame.K_h: IO.BUTTON_HOME,
             pygame.K_ESCAPE: IO.BUTTON_HOME,
         }
+        self.recorder = None  # optional InputRecorder (set in main)
 
     def update(self) -> None:
         self.pressed.clear()
         self.released.clear()
+        recorder = self.recorder
         for event in pygame.event.get():
+            # Button keys are ignored while a recording is being replayed
+            replaying = recorder is not None and recorder.replaying
             if event.type == pygame.QUIT:
                 pygame.quit()
                 sys.exit(0)
+            if event.type in _EXPOSE_EVENTS:
+                # The OS discarded window contents; redraw all of it next present
+                screen.invalidate()
             if event.type == pygame.KEYDOWN:
                 # Handle screenshot key (F12)
                 if event.key == pygame.K_F12:
                     screen.take_screenshot()
-                elif event.key in self._key_map:
+                # Handle input recording (F9) and replay (F10) toggles
+                elif event.key == pygame.K_F9 and recorder is not None:
+                    recorder.toggle_recording()
+                elif event.key == pygame.K_F10 and recorder is not None:
+                    recorder.toggle_replay(self)
+                elif event.key in self._key_map and not replaying:
                     name = self._key_map[event.key]
                     self.pressed.add(name)
                     self.down.add(name)
-            if event.type == pygame.KEYUP:
+            if event.type == pygame.KEYUP and not replaying:
                 if event.key in self._key_map:
                     name = self._key_map[event.key]
                     self.down.discard(name)
                     self.released.add(name)
+        if recorder is not None:
+            recorder.step(self)
         self.held = set(self.down)
         self.changed = set()
         self.changed.update(self.pressed)
         self.changed.update(self.released)
-        now = pygame.time.get_ticks()
+        if self.tick_step_ms is not None:
+            self._virtual_ticks += self.tick_step_ms
+            now = int(self._virtual_ticks)
+        else:
+            now = pygame.time.get_ticks()
         self.ticks_delta = now - self._last_ticks
         self.ticks = now
         self._last_ticks = now
 
 
+class InputRecorder:
+    """Record per-frame button presses/releases to a file and replay them.
+
+    Files are JSON: only frames where something changed are stored, as
+    ``[frame, pressed_mask, released_mask]`` with one bit per button.
+    """
+
+    BUTTONS = (
+        IO.BUTTON_A,
+        IO.BUTTON_B,
+        IO.BUTTON_C,
+        IO.BUTTON_UP,
+        IO.BUTTON_DOWN,
+        IO.BUTTON_LEFT,
+        IO.BUTTON_RIGHT,
+        IO.BUTTON_HOME,
+    )
+
+    def __init__(self, path: str = None) -> None:
+        self.path = path
+        self.recording = False
+        self.replaying = False
+        self.length = 0  # frames in the loaded recording
+        self._frame = 0
+        self._events = []
+        self._replay = {}
+        self._counter = 0
+
+    @classmethod
+    def _encode(cls, names) -> int:
+        mask = 0
+        for bit, name in enumerate(cls.BUTTONS):
+            if name in names:
+                mask |= 1 << bit
+        return mask
+
+    @classmethod
+    def _decode(cls, mask: int) -> set:
+        return {name for bit, name in enumerate(cls.BUTTONS) if mask & (1 << bit)}
+
+    def start_recording(self) -> None:
+        self.replaying = False
+        self.recording = True
+        self._frame = 0
+        self._events = []
+        print("[Simulator] Recording input (F9 to stop)")
+
+    def stop_recording(self) -> None:
+        if not self.recording:
+            return
+        self.recording = False
+        if self.path is None:
+            self.path = f"recording_{self._counter:04d}.json"
+            self._counter += 1
+        data = {
+            "version": 1,
+            "buttons": list(self.BUTTONS),
+            "frames": self._frame,
+            "events": self._events,
+        }
+        with open(self.path, "w", encoding="utf-8") as fh:
+            json.dump(data, fh, separators=(",", ":"))
+        self.length = self._frame
+        print(f"[Simulator] Input recording saved: {self.path} ({self._frame} frames)")
+
+    def toggle_recording(self) -> None:
+        if self.recording:
+            self.stop_recording()
+        else:
+            self.start_recording()
+
+    def load(self, path: str) -> None:
+        """Load a recording from disk so it can be replayed."""
+        with open(path, "r", encoding="utf-8") as fh:
+            data = json.load(fh)
+        self.path = path
+        self.length = int(data.get("frames", 0))
+        self._replay = {int(f): (int(p), int(r)) for f, p, r in data.get("events", [])}
+
+    def start_replay(self, io_obj: "IO") -> None:
+        if self.path is None or not os.path.exists(self.path):
+            print("[Simulator] No input recording to replay. Press F9 to record or use --replay.")
+            return
+        self.recording = False
+        self.load(self.path)
+        self.replaying = True
+        self._frame = 0
+        io_obj.down.clear()
+        print(f"[Simulator] Replaying input: {self.path} ({self.length} frames)")
+
+    def stop_replay(self, io_obj: "IO") -> None:
+        if not self.replaying:
+            return
+        self.replaying = False
+        # Release anything the recording left held down
+        io_obj.released.update(io_obj.down)
+        io_obj.down.clear()
+        print("[Simulator] Input replay finished")
+
+    def toggle_replay(self, io_obj: "IO") -> None:
+        if self.replaying:
+            self.stop_replay(io_obj)
+        else:
+            self.start_replay(io_obj)
+
+    def step(self, io_obj: "IO") -> None:
+        """Apply (replay) or capture (record) this frame's button changes."""
+        if self.replaying:
+            if self._frame >= self.length:
+                self.stop_replay(io_obj)
+                return
+            pressed_mask, released_mask = self._replay.get(self._frame, (0, 0))
+            if pressed_mask or released_mask:
+                pressed = self._decode(pressed_mask)
+                released = self._decode(released_mask)
+                io_obj.pressed.update(pressed)
+                io_obj.down.update(pressed)
+                io_obj.released.update(released)
+                io_obj.down.difference_update(released)
+            self._frame += 1
+        elif self.recording:
+            if io_obj.pressed or io_obj.released:
+                self._events.append(
+                    [self._frame, self._encode(io_obj.pressed), self._encode(io_obj.released)]
+                )
+            self._frame += 1
+
+
 class Display:
     def update(self) -> None:
         # Present the current screen contents.
@@ -1054,10 +1926,18 @@ display = Display()
 
 
 class State:
+    # path -> contents before the running app first saved it (None if it did not exist);
+    # only tracked with --hot-reload reset so a reload can start from the same state
+    _originals = None
+    # Directory for state files; None keeps them in <system root>/.badge_state
+    directory = None
+
     @staticmethod
     def _state_dir() -> str:
-        root = SIM_ROOT or _find_sim_root(os.getcwd())
-        path = os.path.join(root, ".badge_state")
+        path = State.directory
+        if path is None:
+            root = SIM_ROOT or _find_sim_root(os.getcwd())
+            path = os.path.join(root, ".badge_state")
         os.makedirs(path, exist_ok=True)
         return path
 
@@ -1086,6 +1966,12 @@ class State:
     @staticmethod
     def save(name: str, data) -> bool:
         path = State._state_path(name)
+        if State._originals is not None and path not in State._originals:
+            try:
+                with open(path, "rb") as fh:
+                    State._originals[path] = fh.read()
+            except OSError:
+                State._originals[path] = None
         try:
             os.makedirs(os.path.dirname(path), exist_ok=True)
             with open(path, "w", encoding="utf-8") as fh:
@@ -1095,6 +1981,21 @@ class State:
             traceback.print_exc()
             return False
 
+    @staticmethod
+    def restore() -> None:
+        """Put back every state file the app saved since tracking started."""
+        for path, contents in (State._originals or {}).items():
+            try:
+                if contents is None:
+                    os.remove(path)
+                else:
+                    with open(path, "wb") as fh:
+                        fh.write(contents)
+            except OSError:
+                pass
+        if State._originals is not None:
+            State._originals = {}
+
 
 def clamp(value: float, minimum: float, maximum: float) -> float:
     if value < minimum:
@@ -1254,8 +2155,179 @@ class _MockNetwork:
 # -----------------------------------------------------------------------------
 
 # Store reference to real urllib.request before we create mocks
+import urllib.error as _real_urllib_error
+import urllib.parse as _real_urllib_parse
 import urllib.request as _real_urllib_request
 
+# HTTP fixtures and link shaping (configured from the command line in main)
+_http_fixtures = None
+_http_link = None
+
+
+class _LinkShaper:
+    """Give urequest the timing of the badge's 2.4 GHz WiFi link.
+
+    Every request waits a connect latency (plus up to +/- `jitter_ms`) before
+    urlopen returns. Body reads draw from a token bucket refilled at
+    `bandwidth_kbps`, so a few small reads arrive at once and longer transfers
+    settle at the link rate. Each read stalls for `stall_ms` with probability
+    `stall_pct`, like a lost packet waiting for a retransmit.
+
+    Waits block the app, as they do on the badge. With --virtual-clock they
+    advance `io.ticks` instead of sleeping, so timeouts based on ticks behave
+    the same without slowing the run down. Only the frame loop's thread moves
+    the clock: transfers on `_thread` workers wait for it to pass their
+    deadline, so a background download spreads over frames.
+    """
+    
+    BURST_BYTES = 4096  # bucket size: roughly one TCP receive window
+    
+    def __init__(self, latency_ms=0.0, bandwidth_kbps=None, jitter_ms=0.0,
+                 stall_pct=0.0, stall_ms=1000.0, seed=None):
+        self.latency_ms = latency_ms
+        self.bytes_per_ms = bandwidth_kbps / 8.0 if bandwidth_kbps else None
+        self.jitter_ms = jitter_ms
+        self.stall_chance = stall_pct / 100.0
+        self.stall_ms = stall_ms
+        self._random = random.Random(seed)
+        self._tokens = float(self.BURST_BYTES)
+        self._last = None
+        # Requests from the app and from _thread workers share the link
+        self._lock = threading.Lock()
+    
+    @staticmethod
+    def _virtual():
+        return _io_ref is not None and _io_ref.tick_step_ms is not None
+    
+    def _now(self):
+        if self._virtual():
+            return _io_ref._virtual_ticks
+        return time.perf_counter() * 1000.0
+    
+    def _wait(self, ms):
+        if ms <= 0:
+            return
+        if not self._virtual():
+            time.sleep(ms / 1000.0)
+        elif threading.current_thread() is threading.main_thread():
+            _io_ref._virtual_ticks += ms
+        else:
+            deadline = _io_ref._virtual_ticks + ms
+            while _io_ref._virtual_ticks < deadline and not _core_pool.stopping.wait(0.001):
+                pass
+    
+    def connect(self):
+        """Wait out the connect latency of one request."""
+        with self._lock:
+            delay = self.latency_ms
+            if self.jitter_ms:
+                delay += self._random.uniform(-self.jitter_ms, self.jitter_ms)
+        self._wait(delay)
+    
+    def transfer(self, nbytes):
+        """Wait until `nbytes` of response body have come over the link."""
+        if nbytes <= 0:
+            return
+        with self._lock:
+            delay = 0.0
+            if self.stall_chance and self._random.random() < self.stall_chance:
+                delay = self.stall_ms
+            if self.bytes_per_ms is not None:
+                # The link refills the bucket during a stall too
+                now = self._now() + delay
+                if self._last is not None:
+                    self._tokens = min(float(self.BURST_BYTES), self._tokens + (now - self._last) * self.bytes_per_ms)
+                self._tokens -= nbytes
+                if self._tokens < 0:
+                    # Wait for the bucket to refill to zero; the wait itself refills it
+                    delay += -self._tokens / self.bytes_per_ms
+                    self._tokens = 0.0
+                # Reserve the link until this wait is over, before releasing the lock
+                self._last = self._now() + delay
+        self._wait(delay)
+
+
+class _RecordedResponse(BytesIO):
+    """A response body read from an HTTP fixture, in place of a urllib response."""
+    
+    def __init__(self, status, body):
+        super().__init__(body)
+        self.status = status
+
+
+class _HttpFixtures:
+    """Record HTTP responses to a directory and serve them back without a network.
+
+    Each response is stored as `<host>_<hash>.json` (URL, method, status and
+    headers) next to `<host>_<hash>.bin` (the body). The hash covers the method,
+    URL and request body, but not the request headers, so tokens are never
+    written to disk.
+    """
+    
+    def __init__(self, directory, mode):
+        self.directory = directory
+        self.mode = mode  # "record" or "replay"
+        if mode == "record":
+            os.makedirs(directory, exist_ok=True)
+    
+    def _name(self, method, url, data):
+        if isinstance(data, str):
+            data = data.encode("utf-8")
+        digest = hashlib.sha1(f"{method} {url}\n".encode("utf-8") + (data or b"")).hexdigest()[:12]
+        host = _real_urllib_parse.urlsplit(url).hostname or "url"
+        return os.path.join(self.directory, f"{host}_{digest}")
+    
+    def save(self, method, url, data, status, headers, body):
+        name = self._name(method, url, data)
+        with _real_open(name + ".bin", "wb") as fh:
+            fh.write(body)
+        meta = {
+            "url": url,
+            "method": method,
+            "status": status,
+            "headers": dict(headers or {}),
+            "body": os.path.basename(name) + ".bin",
+        }
+        with _real_open(name + ".json", "w", encoding="utf-8") as fh:
+            json.dump(meta, fh, indent=2)
+    
+    def load(self, method, url, data):
+        """Return (status, headers, body) recorded for this request, or None."""
+        name = self._name(method, url, data)
+        try:
+            with _real_open(name + ".json", "r", encoding="utf-8") as fh:
+                meta = json.load(fh)
+            with _real_open(os.path.join(self.directory, meta["body"]), "rb") as fh:
+                body = fh.read()
+        except (OSError, ValueError, KeyError):
+            return None
+        return int(meta.get("status", 200)), meta.get("headers", {}), body
+    
+    def urlopen(self, req):
+        """Serve (replay) or fetch and store (record) the response to `req`."""
+        method = req.get_method()
+        url = req.full_url
+        if self.mode == "replay":
+            recorded = self.load(method, url, req.data)
+            if recorded is None:
+                raise OSError(f"No HTTP fixture for {method} {url} in {self.directory}")
+            status, headers, body = recorded
+            if status >= 400:
+                raise _real_urllib_error.HTTPError(url, status, "Recorded HTTP error", headers, BytesIO(body))
+            return _RecordedResponse(status, body)
+        
+        try:
+            response = _real_urllib_request.urlopen(req)
+        except _real_urllib_error.HTTPError as e:
+            self.save(method, url, req.data, e.code, e.headers, e.read())
+            raise
+        with response:
+            body = response.read()
+        self.save(method, url, req.data, response.status, response.headers, body)
+        print(f"[Simulator] Recorded HTTP fixture: {method} {url} ({len(body)} bytes)")
+        return _RecordedResponse(response.status, body)
+
+
 class _MockUrequestResponse:
     """Mock response object for urlopen that uses Python's urllib."""
     
@@ -1265,13 +2337,18 @@ class _MockUrequestResponse:
     
     def read(self, size=-1):
         """Read response data."""
-        return self._response.read(size)
+        data = self._response.read(size)
+        if _http_link:
+            _http_link.transfer(len(data))
+        return data
     
     def readinto(self, buffer):
         """Read response data into a buffer (MicroPython style)."""
         data = self._response.read(len(buffer))
         if not data:
             return 0
+        if _http_link:
+            _http_link.transfer(len(data))
         buffer[:len(data)] = data
         return len(data)
     
@@ -1298,13 +2375,384 @@ class _MockUrequest:
         else:
             req = _real_urllib_request.Request(url, data=data)
         
+        # Time to connect and receive the response headers
+        if _http_link:
+            _http_link.connect()
         try:
-            response = _real_urllib_request.urlopen(req)
+            if _http_fixtures:
+                response = _http_fixtures.urlopen(req)
+            else:
+                response = _real_urllib_request.urlopen(req)
             return _MockUrequestResponse(response)
         except Exception as e:
             print(f"[Simulator] HTTP Error: {e}")
             raise
 
+# -----------------------------------------------------------------------------
+# Mock _thread (the RP2350's second core) and badgeware.fetch_async
+# -----------------------------------------------------------------------------
+
+import _thread as _real_thread
+
+
+class _CorePool:
+    """Daemon worker threads standing in for the RP2350's second core.
+
+    `_thread.start_new_thread` raises OSError while every worker is busy, like
+    MicroPython's rp2 port does while core1 is running. `fetch_async` jobs
+    queue instead and run as workers come free. The app sees this pool as
+    `_thread` from install() until shutdown(), which runs when it unloads.
+    """
+    
+    # How long shutdown() waits for each worker to finish its current job
+    JOIN_TIMEOUT_S = 2.0
+    
+    def __init__(self, workers: int = 1) -> None:
+        self.workers = workers
+        self.fetches = []  # Fetch handles still running; guarded by _lock
+        self.stopping = threading.Event()  # set while shutdown() winds the workers down
+        self._queue = queue.Queue()
+        self._threads = []
+        self._pending = 0
+        self._lock = threading.Lock()
+        self._next_ident = 1
+    
+    def submit(self, function, *args, **kwargs) -> None:
+        with self._lock:
+            self._pending += 1
+            if len(self._threads) < min(self.workers, self._pending):
+                worker = threading.Thread(target=self._work, args=(self._queue,),
+                                          name=f"core1-{len(self._threads)}", daemon=True)
+                self._threads.append(worker)
+                worker.start()
+            self._queue.put((function, args, kwargs))
+    
+    def _work(self, jobs) -> None:
+        while True:
+            job = jobs.get()
+            if job is None:
+                return
+            function, args, kwargs = job
+            try:
+                function(*args, **kwargs)
+            except SystemExit:
+                pass  # _thread.exit()
+            except Exception:
+                print("[Simulator] Unhandled exception in thread started by", function)
+                traceback.print_exc()
+            finally:
+                with self._lock:
+                    # A worker left behind by shutdown() no longer counts
+                    if jobs is self._queue:
+                        self._pending -= 1
+    
+    def start_new_thread(self, function, args, kwargs=None) -> int:
+        """`_thread.start_new_thread` on a free worker."""
+        with self._lock:
+            if self._pending >= self.workers:
+                raise OSError("core1 in use")
+            ident = self._next_ident
+            self._next_ident += 1
+        self.submit(function, *args, **(kwargs or {}))
+        return ident
+    
+    def add_fetch(self, fetch: "Fetch") -> None:
+        with self._lock:
+            self.fetches.append(fetch)
+    
+    def remove_fetch(self, fetch: "Fetch") -> None:
+        with self._lock:
+            if fetch in self.fetches:
+                self.fetches.remove(fetch)
+    
+    def cancel_fetches(self) -> None:
+        """Ask every running fetch to stop, e.g. when its app exits."""
+        with self._lock:
+            fetches, self.fetches = self.fetches, []
+        for fetch in fetches:
+            fetch.cancel()
+    
+    def install(self) -> None:
+        """Make `import _thread` in the app return a module backed by this pool."""
+        module = ModuleType("_thread")
+        module.__dict__.update(
+            {name: value for name, value in vars(_real_thread).items() if not name.startswith("__")}
+        )
+        module.start_new_thread = module.start_new = self.start_new_thread
+        module.stack_size = lambda size=0: 0
+        sys.modules["_thread"] = module
+    
+    def shutdown(self) -> None:
+        """Cancel fetches, stop and join the workers, and put the real `_thread` back."""
+        self.cancel_fetches()
+        self.stopping.set()
+        with self._lock:
+            threads, self._threads = self._threads, []
+            jobs, self._queue = self._queue, queue.Queue()
+            self._pending = 0
+        # Queued jobs never start; each worker stops after its current one
+        try:
+            while True:
+                jobs.get_nowait()
+        except queue.Empty:
+            pass
+        for _ in threads:
+            jobs.put(None)
+        for worker in threads:
+            worker.join(self.JOIN_TIMEOUT_S)
+            if worker.is_alive():
+                print(f"[Simulator] {worker.name} is still running a thread the app started; leaving it behind")
+        self.stopping.clear()
+        sys.modules["_thread"] = _real_thread
+
+
+class Fetch:
+    """Handle returned by `fetch_async()`; poll it from `update()`."""
+    
+    CHUNK_BYTES = 1024
+    
+    def __init__(self, url: str, path: str) -> None:
+        self.url = url
+        self.path = path
+        self.done = False
+        self.bytes = 0      # bytes written so far
+        self.result = None  # `path` once the download has completed
+        self.error = None   # the exception that ended the download, if any
+        self._cancelled = False
+        self._started = False
+    
+    def cancel(self) -> None:
+        """Stop the download after its current chunk; the partial file is removed."""
+        self._cancelled = True
+        if not self._started:
+            # Still queued: it will never run, so it ends here
+            self.error = OSError("fetch cancelled")
+            self.done = True
+    
+    def _run(self, headers) -> None:
+        self._started = True
+        opened = False
+        try:
+            if self._cancelled:
+                raise OSError("fetch cancelled")
+            response = _MockUrequest.urlopen(self.url, headers=headers)
+            try:
+                # Cancelled while connecting: leave any existing file at `path` alone
+                if self._cancelled:
+                    raise OSError("fetch cancelled")
+                chunk = bytearray(self.CHUNK_BYTES)
+                with open(self.path, "wb") as fh:
+                    opened = True
+                    while not self._cancelled:
+                        length = response.readinto(chunk)
+                        if not length:
+                            break
+                        fh.write(chunk[:length])
+                        self.bytes += length
+            finally:
+                response.close()
+            if self._cancelled:
+                raise OSError("fetch cancelled")
+            self.result = self.path
+        except Exception as e:
+            self.error = e
+            if opened:
+                try:
+                    os.remove(self.path)
+                except OSError:
+                    pass
+        finally:
+            self.done = True
+            _core_pool.remove_fetch(self)
+    
+    def __repr__(self) -> str:
+        state = "failed" if self.error else "done" if self.done else f"{self.bytes} bytes"
+        return f"<Fetch {self.url} {state}>"
+
+
+_core_pool = _CorePool()
+
+
+def fetch_async(url: str, path: str, headers=None) -> Fetch:
+    """Download `url` to `path` on the second core; returns a `Fetch` to poll."""
+    fetch = Fetch(url, path)
+    _core_pool.add_fetch(fetch)
+    _core_pool.submit(fetch._run, headers)
+    return fetch
+
+# -----------------------------------------------------------------------------
+# Cooperative tasks (badgeware.spawn)
+# -----------------------------------------------------------------------------
+
+class sleep_ms:
+    """Pause the current task: `await sleep_ms(100)` or `yield from sleep_ms(100)`."""
+    
+    def __init__(self, ms: float = 0) -> None:
+        self.ms = ms
+    
+    def __await__(self):
+        yield self.ms
+    
+    __iter__ = __await__
+
+
+class Task:
+    """Handle for a task started with `spawn()`; poll it from `update()`."""
+    
+    def __init__(self, coro, name: str) -> None:
+        self.name = name
+        self.done = False
+        self.result = None  # the task's return value once done
+        self.error = None   # the exception that ended the task, if any
+        self._coro = coro
+        self._wake = 0
+    
+    def cancel(self) -> None:
+        """Stop the task; its `finally` blocks run now."""
+        if not self.done:
+            self.done = True
+            self._coro.close()
+    
+    def __repr__(self) -> str:
+        state = "failed" if self.error else "done" if self.done else "running"
+        return f"<Task {self.name} {state}>"
+
+
+class _Scheduler:
+    """Step spawned tasks between frames, for up to `budget_ms` each frame.
+
+    A task is a generator or coroutine. Each `yield` (or `await sleep_ms(0)`)
+    hands control back; the task runs again this frame if there is budget
+    left, otherwise next frame. `yield MS` or `await sleep_ms(MS)` keeps it
+    asleep until `io.ticks` has advanced by MS. A step always runs to its next
+    yield, so a step that blocks (a slow read, say) still delays the frame.
+    With --virtual-clock every ready task steps exactly once per frame, so
+    runs stay repeatable.
+    """
+    
+    def __init__(self, budget_ms: float = 5.0) -> None:
+        self.budget_ms = budget_ms
+        self.tasks = []
+    
+    def spawn(self, task) -> Task:
+        """Start running a generator or coroutine (or a function returning one) between frames."""
+        if callable(task) and not hasattr(task, "send"):
+            task = task()
+        if not hasattr(task, "send"):
+            raise TypeError("spawn() needs a generator or coroutine")
+        name = getattr(task, "__name__", type(task).__name__)
+        handle = Task(task, name)
+        self.tasks.append(handle)
+        return handle
+    
+    def _step(self, task: Task, now: int) -> None:
+        try:
+            delay = task._coro.send(None)
+        except StopIteration as e:
+            task.done = True
+            task.result = e.value
+        except Exception as e:
+            task.done = True
+            task.error = e
+            print(f"[Simulator] Task {task.name} failed:")
+            traceback.print_exc()
+        else:
+            task._wake = now + delay if isinstance(delay, (int, float)) and delay > 0 else now
+    
+    def run_once(self, now: int) -> None:
+        """Step ready tasks until the frame's budget is used up."""
+        if not self.tasks:
+            return
+        once = io.tick_step_ms is not None
+        deadline = time.perf_counter() + self.budget_ms / 1000.0
+        stepped = False
+        while True:
+            ready = [task for task in self.tasks if not task.done and task._wake <= now]
+            for task in ready:
+                # Always make some progress, then stop once the budget is spent
+                if stepped and not once and time.perf_counter() >= deadline:
+                    ready = None
+                    break
+                self._step(task, now)
+                stepped = True
+            if once or not ready:
+                break
+        self.tasks = [task for task in self.tasks if not task.done]
+    
+    def clear(self) -> None:
+        """Cancel every task, e.g. when the app exits."""
+        for task in self.tasks:
+            task.cancel()
+        self.tasks = []
+
+
+_scheduler = _Scheduler()
+
+# -----------------------------------------------------------------------------
+# Hot reload
+# -----------------------------------------------------------------------------
+
+class _AppWatcher:
+    """Poll the running app's directory from a background thread and flag changes.
+
+    `changed` holds the first file seen added, removed or modified since the last
+    `reset()`; `run()` checks it once per frame.
+    """
+    
+    POLL_SECONDS = 0.25
+    
+    def __init__(self, path: str) -> None:
+        self.path = os.path.abspath(path)
+        self.changed = None
+        self._mtimes = self._scan()
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._poll, name="app-watcher", daemon=True)
+        self._thread.start()
+    
+    def _scan(self) -> dict:
+        mtimes = {}
+        for dirpath, dirnames, filenames in os.walk(self.path):
+            # Skip bytecode caches and hidden directories
+            dirnames[:] = [d for d in dirnames if d != "__pycache__" and not d.startswith(".")]
+            for name in filenames:
+                # Skip hidden files and editor backups/swap files
+                if name.startswith(".") or name.endswith(("~", ".swp", ".pyc")):
+                    continue
+                path = os.path.join(dirpath, name)
+                try:
+                    mtimes[path] = os.stat(path).st_mtime_ns
+                except OSError:
+                    pass
+        return mtimes
+    
+    def _poll(self) -> None:
+        while not self._stop.wait(self.POLL_SECONDS):
+            mtimes = self._scan()
+            if mtimes != self._mtimes:
+                if self.changed is None:
+                    self.changed = min(set(mtimes.items()) ^ set(self._mtimes.items()))[0]
+                self._mtimes = mtimes
+    
+    def reset(self) -> None:
+        self.changed = None
+    
+    def wait(self) -> bool:
+        """Keep the window responsive until something in the app changes.
+        
+        Returns False if the window was closed instead.
+        """
+        print(f"[Simulator] Waiting for changes in {self.path} (close the window to quit)")
+        while self.changed is None:
+            for event in pygame.event.get():
+                if event.type == pygame.QUIT:
+                    return False
+            time.sleep(0.05)
+        return True
+    
+    def stop(self) -> None:
+        self._stop.set()
+        self._thread.join()
+
 # -----------------------------------------------------------------------------
 # Runner
 # -----------------------------------------------------------------------------
@@ -1326,6 +2774,17 @@ def _cleanup_pycache():
     except Exception:
         pass
 
+# Profiling and headless benchmark settings (configured from the command line in main)
+_perf_monitor = None
+_headless = False
+_frame_timer = None
+_random_seed = None
+_draw_profiler = None
+_alloc_tracer = None
+_device_model = None
+_startup_profiler = None
+_app_watcher = None
+
 def run(update_func, fps: int = 60, init=None, on_exit=None):
     if not callable(init):
         module_name = getattr(update_func, "__module__", None)
@@ -1340,9 +2799,22 @@ def run(update_func, fps: int = 60, init=None, on_exit=None):
     # Get performance monitor from global if available
     perf_monitor = globals().get('_perf_monitor', None)
     
+    # --alloc-trace measures what each update() call allocates; the device cost
+    # model counts the calls it makes; --startup-profile times the first one
+    call_update = update_func
+    if _alloc_tracer:
+        call_update = functools.partial(_alloc_tracer.trace, call_update)
+    if _device_model:
+        call_update = functools.partial(_device_model.trace, call_update)
+    if _startup_profiler:
+        call_update = functools.partial(_startup_profiler.trace_update, call_update)
+    
     try:
         if callable(init):
-            init()
+            if _startup_profiler:
+                _startup_profiler.measure("init()", init)
+            else:
+                init()
         while True:
             io.update()
             
@@ -1351,17 +2823,51 @@ def run(update_func, fps: int = 60, init=None, on_exit=None):
                 result = "__RETURN_TO_MENU__"
                 break
             
-            result = update_func()
+            # --hot-reload: an app file changed on disk
+            if _app_watcher and _app_watcher.changed:
+                result = "__RELOAD__"
+                break
+            
+            update_ms = device_ms = None
+            if _frame_timer or perf_monitor:
+                start = time.perf_counter()
+                result = call_update()
+                update_ms = (time.perf_counter() - start) * 1000.0
+                if _frame_timer:
+                    _frame_timer.record(update_ms)
+            else:
+                result = call_update()
             screen.present()
-            clock.tick(fps)
+            if _capture.recording:
+                _capture.capture(screen._surface, io.ticks)
+            # Step spawned tasks in the time left before the next frame
+            _scheduler.run_once(io.ticks)
+            if _startup_profiler:
+                _startup_profiler.presented()
+            if _draw_profiler:
+                _draw_profiler.end_frame()
+            if _device_model:
+                device_ms = _device_model.end_frame()
+            if _headless:
+                # Uncapped: tick only so the clock keeps measuring FPS
+                clock.tick()
+            else:
+                clock.tick(fps)
             
             # Update performance metrics if enabled
             if perf_monitor:
-                perf_monitor.update(clock)
+                perf_monitor.update(clock, update_ms, device_ms)
+            
+            # Stop once the requested number of frames has been run
+            if _frame_timer and _frame_timer.exhausted:
+                result = "__FRAME_LIMIT__"
+                break
             
             if result is not None:
                 break
     finally:
+        # Tasks belong to the app that spawned them
+        _scheduler.clear()
         if callable(on_exit):
             try:
                 on_exit()
@@ -1417,6 +2923,10 @@ def load_game_module(module_path: str) -> ModuleType:
     badgeware.display = display
     badgeware.State = State
     badgeware.clamp = clamp
+    badgeware.spawn = _scheduler.spawn
+    badgeware.sleep_ms = sleep_ms
+    badgeware.Task = Task
+    badgeware.fetch_async = fetch_async
     sys.modules["badgeware"] = badgeware
     
     # Set global reference for mock network timing
@@ -1448,11 +2958,19 @@ def load_game_module(module_path: str) -> ModuleType:
     # Also provide a top-level urequest for direct imports
     sys.modules["urequest"] = urequest_module
     
+    # Provide `_thread`, with threads run on a bounded pool like the badge's second core;
+    # _unload_app() puts the real module back
+    _core_pool.install()
+    
     # Provide mock `urandom` module for MicroPython compatibility
     # Uses Python's standard random module
     urandom_module = ModuleType("urandom")
     import random as _random
     
+    # Reseed on every app load so a session replays the same random sequence
+    if _random_seed is not None:
+        _random.seed(_random_seed)
+    
     def _urandom_getrandbits(n):
         """Get n random bits as an integer."""
         return _random.getrandbits(n)
@@ -1553,7 +3071,11 @@ def load_game_module(module_path: str) -> ModuleType:
             keys = pygame.key.get_pressed()
             
             # Rate limit simulation to once per second
-            current_time = pygame.time.get_ticks()
+            # Use io.ticks so the virtual clock applies here too
+            if _io_ref is not None:
+                current_time = _io_ref.ticks
+            else:
+                current_time = pygame.time.get_ticks()
             if current_time - self._last_simulate_time < 1000:
                 return
             
@@ -1597,6 +3119,57 @@ def load_game_module(module_path: str) -> ModuleType:
     spec.loader.exec_module(mod)  # type: ignore
     return mod
 
+
+def _unload_app(game_dir) -> None:
+    """Forget everything an app loaded so the next app starts clean."""
+    # Clean up sys.path entries added by the previous app
+    game_dir_abs = os.path.abspath(game_dir) if game_dir else None
+    if game_dir_abs:
+        paths_to_remove = [p for p in sys.path if os.path.abspath(p).startswith(game_dir_abs)]
+        for p in paths_to_remove:
+            while p in sys.path:
+                sys.path.remove(p)
+    
+    # Remove all modules that were loaded from the previous app
+    modules_to_remove = []
+    for mod_name, mod in sys.modules.items():
+        if mod and hasattr(mod, "__file__") and mod.__file__:
+            mod_file = os.path.abspath(mod.__file__)
+            if game_dir_abs and mod_file.startswith(game_dir_abs):
+                modules_to_remove.append(mod_name)
+    
+    for mod_name in modules_to_remove:
+        del sys.modules[mod_name]
+    
+    # Also remove the main module loaded as "badge_game"
+    if "badge_game" in sys.modules:
+        del sys.modules["badge_game"]
+    
+    # Also remove common app modules that can conflict (like ui, icon)
+    # These will be re-imported fresh when the next app loads
+    for common_mod in ["ui", "icon", "beacon", "mona"]:
+        if common_mod in sys.modules:
+            del sys.modules[common_mod]
+    
+    # Stop tasks, downloads and threads the app started that are still running
+    _scheduler.clear()
+    _core_pool.shutdown()
+    
+    # Clear image cache to simulate badge behavior (old app's images are freed)
+    Image._cache.clear()
+    _text_cache.clear()
+    _scale_cache.clear()
+    
+    # Reset asset tracker when switching apps
+    if _perf_monitor and _perf_monitor.enabled:
+        _perf_monitor.asset_tracker.reset()
+    
+    # Force garbage collection to free memory
+    import gc
+    collected = gc.collect()
+    if collected > 0:
+        print(f"[Simulator] Garbage collected {collected} objects")
+
 # -----------------------------------------------------------------------------
 # Performance monitoring
 # -----------------------------------------------------------------------------
@@ -1609,13 +3182,14 @@ class AssetTracker:
         self.fonts = set()
         self.peak_images = 0
         
-    def register_image(self, path, width, height):
+    def register_image(self, path, width, height, estimated_bytes=None):
         """Register an image and estimate its memory footprint."""
         if path not in self.images:
-            # MicroPython images: 2 bytes per pixel (RGB565) is typical
-            # Full RGBA would be 4 bytes/pixel, paletted can be 1-2 bytes
-            # Use 2 bytes as a reasonable average
-            estimated_bytes = width * height * 2
+            if estimated_bytes is None:
+                # MicroPython images: 2 bytes per pixel (RGB565) is typical
+                # Full RGBA would be 4 bytes/pixel, paletted can be 1-2 bytes
+                # Use 2 bytes as a reasonable average
+                estimated_bytes = width * height * 2
             self.images[path] = (width, height, estimated_bytes)
             if len(self.images) > self.peak_images:
                 self.peak_images = len(self.images)
@@ -1648,10 +3222,815 @@ class AssetTracker:
         self.fonts.clear()
 
 
+class FrameTimer:
+    """Collect per-frame update() timings for each app and stop after a frame limit."""
+    
+    def __init__(self, limit=None):
+        self.limit = limit
+        self.frames = 0
+        self.samples = {}  # app name -> list of update() times in ms
+        self.current_app = None
+    
+    def begin_app(self, name):
+        """Start attributing timings to a newly loaded app."""
+        self.current_app = name
+        self.samples.setdefault(name, [])
+    
+    def record(self, elapsed_ms):
+        """Record the update() time of one frame."""
+        self.samples.setdefault(self.current_app, []).append(elapsed_ms)
+        self.frames += 1
+    
+    @property
+    def exhausted(self):
+        """True once the frame limit (if any) has been reached."""
+        return self.limit is not None and self.frames >= self.limit
+    
+    @staticmethod
+    def _percentile(ordered, pct):
+        """Nearest-rank percentile of an already sorted list."""
+        if not ordered:
+            return 0.0
+        rank = max(1, int(math.ceil(pct / 100.0 * len(ordered))))
+        return ordered[rank - 1]
+    
+    def summary(self):
+        """Return {app: {frames, mean, p50, p95, p99, max}} for every app that ran."""
+        stats = {}
+        for app, times in self.samples.items():
+            if not times:
+                continue
+            ordered = sorted(times)
+            stats[app] = {
+                "frames": len(ordered),
+                "mean": sum(ordered) / len(ordered),
+                "p50": self._percentile(ordered, 50),
+                "p95": self._percentile(ordered, 95),
+                "p99": self._percentile(ordered, 99),
+                "max": ordered[-1],
+            }
+        return stats
+    
+    def report(self):
+        """Print a per-app table of update() timings."""
+        stats = self.summary()
+        if not stats:
+            return
+        print("\n[Bench] update() time per frame (ms)")
+        print(f"{'App':<16} {'Frames':>7} {'Mean':>8} {'p50':>8} {'p95':>8} {'p99':>8} {'Max':>8}")
+        for app, row in stats.items():
+            print(f"{str(app):<16} {row['frames']:>7} {row['mean']:>8.3f} {row['p50']:>8.3f} "
+                  f"{row['p95']:>8.3f} {row['p99']:>8.3f} {row['max']:>8.3f}")
+
+
+def _sim_relpath(path):
+    """Return `path` relative to SIM_ROOT when it lies inside it."""
+    root = SIM_ROOT or ""
+    if root and os.path.abspath(path).startswith(root):
+        return os.path.relpath(path, root)
+    return path
+
+
+def _site_label(path, lineno, name=None):
+    """Format an app source line as 'file:line (function)', relative to SIM_ROOT."""
+    path = _sim_relpath(path)
+    if name:
+        return f"{path}:{lineno} ({name})"
+    return f"{path}:{lineno}"
+
+
+class DrawProfiler:
+    """Count, time and attribute badgeware draw calls to the app lines that issue them.
+
+    Installing the profiler wraps the drawing methods of `_SurfaceTarget` (and so
+    `Screen`/`Image`) and `_Window`, plus `Matrix.__init__` to count allocations.
+    Pixels touched are the area of the bounding rect each call leaves in
+    `_last_rect`.
+    """
+    
+    METHODS = ("clear", "draw", "blit", "scale_blit", "text", "measure_text")
+    
+    def __init__(self, trace_path=None):
+        self.trace_path = trace_path
+        self._trace = None
+        self.current_app = None
+        self.apps = {}    # app -> totals across frames
+        self.sites = {}   # (app, site, method) -> [calls, seconds, pixels]
+        self._frame = {}  # (site, method) -> [calls, seconds, pixels] for this frame
+        self._frame_matrices = 0
+        self._frame_index = 0
+        self._originals = []
+    
+    def install(self):
+        """Wrap the badgeware drawing methods and open the trace file."""
+        if self.trace_path:
+            self._trace = open(self.trace_path, "w", encoding="utf-8")
+        for cls, prefix in ((_SurfaceTarget, ""), (_Window, "window.")):
+            for name in self.METHODS:
+                func = cls.__dict__[name]
+                self._originals.append((cls, name, func))
+                setattr(cls, name, self._wrap(func, prefix + name))
+        matrix_init = Matrix.__init__
+        self._originals.append((Matrix, "__init__", matrix_init))
+        profiler = self
+        
+        def counting_init(matrix, *args, **kwargs):
+            profiler._frame_matrices += 1
+            matrix_init(matrix, *args, **kwargs)
+        
+        Matrix.__init__ = counting_init
+    
+    def uninstall(self):
+        """Restore the original methods and close the trace file."""
+        for cls, name, func in reversed(self._originals):
+            setattr(cls, name, func)
+        self._originals = []
+        if self._trace:
+            self._trace.close()
+            self._trace = None
+    
+    def _wrap(self, func, label):
+        profiler = self
+        
+        def wrapper(target, *args, **kwargs):
+            target._last_rect = None
+            start = time.perf_counter()
+            result = func(target, *args, **kwargs)
+            elapsed = time.perf_counter() - start
+            rect = target._last_rect
+            pixels = rect.width * rect.height if rect is not None else 0
+            profiler._record(label, elapsed, pixels, sys._getframe(1))
+            return result
+        
+        wrapper.__name__ = func.__name__
+        wrapper.__doc__ = func.__doc__
+        return wrapper
+    
+    @staticmethod
+    def _site(frame):
+        """Describe the first caller outside the simulator as 'file:line (function)'."""
+        while frame is not None and frame.f_code.co_filename == __file__:
+            frame = frame.f_back
+        if frame is None:
+            return "<simulator>"
+        return _site_label(frame.f_code.co_filename, frame.f_lineno, frame.f_code.co_name)
+    
+    def _record(self, label, elapsed, pixels, frame):
+        key = (self._site(frame), label)
+        entry = self._frame.get(key)
+        if entry is None:
+            self._frame[key] = [1, elapsed, pixels]
+        else:
+            entry[0] += 1
+            entry[1] += elapsed
+            entry[2] += pixels
+    
+    def begin_app(self, name):
+        """Start attributing calls to a newly loaded app."""
+        self.current_app = name
+        self.apps.setdefault(name, {"frames": 0, "calls": 0, "seconds": 0.0, "pixels": 0, "matrices": 0})
+    
+    def end_frame(self):
+        """Fold this frame's calls into the totals and write a trace line."""
+        app = self.current_app
+        totals = self.apps.setdefault(app, {"frames": 0, "calls": 0, "seconds": 0.0, "pixels": 0, "matrices": 0})
+        totals["frames"] += 1
+        totals["matrices"] += self._frame_matrices
+        calls = seconds = pixels = 0
+        for (site, label), (n, secs, px) in self._frame.items():
+            calls += n
+            seconds += secs
+            pixels += px
+            entry = self.sites.setdefault((app, site, label), [0, 0.0, 0])
+            entry[0] += n
+            entry[1] += secs
+            entry[2] += px
+        totals["calls"] += calls
+        totals["seconds"] += seconds
+        totals["pixels"] += pixels
+        
+        if self._trace:
+            record = {
+                "frame": self._frame_index,
+                "app": app,
+                "calls": calls,
+                "host_ms": round(seconds * 1000.0, 4),
+                "pixels": pixels,
+                "matrices": self._frame_matrices,
+                "sites": [
+                    {"site": site, "method": label, "calls": n,
+                     "host_ms": round(secs * 1000.0, 4), "pixels": px}
+                    for (site, label), (n, secs, px) in self._frame.items()
+                ],
+            }
+            self._trace.write(json.dumps(record, separators=(",", ":")) + "\n")
+        
+        self._frame = {}
+        self._frame_matrices = 0
+        self._frame_index += 1
+    
+    def report(self, top=10):
+        """Print per-app per-frame averages and the busiest call sites."""
+        for app, totals in self.apps.items():
+            frames = totals["frames"]
+            if not frames:
+                continue
+            print(f"\n[Profile] {app}: {frames} frames | per frame: "
+                  f"{totals['calls'] / frames:.1f} calls, "
+                  f"{totals['seconds'] * 1000.0 / frames:.3f}ms host, "
+                  f"{totals['pixels'] / frames:.0f} px, "
+                  f"{totals['matrices'] / frames:.1f} Matrix()")
+            rows = [(site, label, v) for (a, site, label), v in self.sites.items() if a == app]
+            rows.sort(key=lambda row: row[2][1], reverse=True)
+            print(f"  {'Calls/f':>8} {'ms/f':>8} {'px/f':>8}  Method        Site")
+            for site, label, (n, secs, px) in rows[:top]:
+                print(f"  {n / frames:>8.1f} {secs * 1000.0 / frames:>8.3f} {px / frames:>8.0f}  "
+                      f"{label:<13} {site}")
+
+
+class AllocTracer:
+    """Attribute the memory each update() call allocates to app source lines.
+
+    While update() runs, app lines are traced and tracemalloc's peak is read at
+    every line boundary. A line execution that pushed traced memory above its
+    starting point counts as one allocation of that many bytes, even when the
+    garbage was freed again before the line finished (on CPython most of it is;
+    on MicroPython all of it feeds the GC). Calls into the simulator are charged
+    only for what they return, not for their internal bookkeeping.
+
+    Snapshots taken around update() add the blocks and bytes still alive when it
+    returned, which is how per-frame growth and leaks show up. Sizes are CPython
+    sizes, so treat bytes as relative; counts are the signal.
+    """
+    
+    # Deeper tracebacks make every traced allocation much slower; three frames
+    # reach from library internals back to the app line that called them
+    NFRAMES = 3
+    
+    def __init__(self):
+        self.current_app = None
+        self.apps = {}    # app -> totals across frames
+        self.sites = {}   # (app, (file, line)) -> [allocs, bytes, kept blocks, kept bytes]
+        self._names = {}  # (file, line) -> function name
+        self._frame = {}  # (file, line) -> [allocs, bytes] for this frame
+        self._is_app = {}  # filename -> True if it belongs to an app
+        self._stack = []  # [site, bytes] for the current line of each active app frame
+        self._start = 0
+        self._call_start = 0
+        self._in_call = False
+        self._blocks = None
+        # Bound once: a fresh bound method per trace event would itself be garbage
+        self._app_tracer = self._on_app_event
+        self._library_tracer = self._on_library_event
+    
+    def install(self):
+        """Start tracemalloc; app frames are traced only while update() runs."""
+        tracemalloc.start(self.NFRAMES)
+    
+    def uninstall(self):
+        """Stop tracemalloc."""
+        sys.settrace(None)
+        tracemalloc.stop()
+    
+    def begin_app(self, name):
+        """Start attributing allocations to a newly loaded app."""
+        self.current_app = name
+        self.apps.setdefault(name, {"frames": 0, "allocs": 0, "bytes": 0, "kept_blocks": 0, "kept_bytes": 0})
+        self._blocks = None
+    
+    @staticmethod
+    def _live_blocks():
+        """Snapshot live blocks as a dict of traceback -> (count, size).
+
+        Snapshot.compare_to() sorts and diffs a StatisticDiff for every
+        traceback and costs a few hundred ms per frame; _end_frame() only looks
+        at the tracebacks whose totals changed.
+        """
+        snapshot = tracemalloc.take_snapshot()
+        return {stat.traceback: (stat.count, stat.size) for stat in snapshot.statistics("traceback")}
+    
+    def trace(self, update_func):
+        """Call update_func() with allocation tracing and fold the results into this frame."""
+        # Only the simulator runs between frames, so the previous frame's closing
+        # snapshot doubles as this frame's opening one
+        before = self._blocks or self._live_blocks()
+        self._stack = []
+        self._in_call = False
+        sys.settrace(self._on_call)
+        try:
+            return update_func()
+        finally:
+            sys.settrace(None)
+            after = self._blocks = self._live_blocks()
+            self._end_frame(after, before)
+    
+    # -- sys.settrace callbacks ------------------------------------------------
+    
+    def _app_file(self, path):
+        is_app = self._is_app.get(path)
+        if is_app is None:
+            root = SIM_ROOT or os.getcwd()
+            # Frozen stdlib modules report names like "<frozen posixpath>", which
+            # abspath() would place under an app's working directory
+            is_app = (path != __file__ and os.path.isabs(path)
+                      and path.startswith(root + os.sep))
+            self._is_app[path] = is_app
+        return is_app
+    
+    def _begin_segment(self):
+        # Read first: the tuple get_traced_memory() returns must not set the new peak
+        self._start = tracemalloc.get_traced_memory()[0]
+        tracemalloc.reset_peak()
+    
+    def _end_segment(self, frame=None):
+        if self._stack:
+            current, peak = tracemalloc.get_traced_memory()
+            if frame is not None and peak == current:
+                # Tracing a call materializes its frame object just before this
+                # callback; that is tracing overhead, not the app's garbage
+                peak -= sys.getsizeof(frame)
+            if peak > self._start:
+                self._stack[-1][1] += peak - self._start
+    
+    def _flush_line(self, entry):
+        site, allocated = entry
+        if site is not None and allocated > 0:
+            counts = self._frame.get(site)
+            if counts is None:
+                self._frame[site] = [1, allocated]
+            else:
+                counts[0] += 1
+                counts[1] += allocated
+        entry[1] = 0
+    
+    def _on_call(self, frame, event, arg):
+        if self._in_call:
+            # Nested inside a simulator/library call that is already being measured
+            return None
+        if self._app_file(frame.f_code.co_filename):
+            self._end_segment(frame)
+            self._stack.append([None, 0])
+            self._begin_segment()
+            return self._app_tracer
+        if not self._stack:
+            return None
+        # A badgeware (or library) call from an app line: charge only what it returns
+        self._end_segment(frame)
+        self._in_call = True
+        self._call_start = tracemalloc.get_traced_memory()[0]
+        frame.f_trace_lines = False
+        return self._library_tracer
+    
+    def _on_app_event(self, frame, event, arg):
+        entry = self._stack[-1] if self._stack else None
+        if entry is None:
+            return None
+        if event == "line":
+            self._end_segment()
+            self._flush_line(entry)
+            code = frame.f_code
+            site = (code.co_filename, frame.f_lineno)
+            entry[0] = site
+            if site not in self._names:
+                self._names[site] = code.co_name
+            self._begin_segment()
+        elif event == "return":
+            self._end_segment()
+            self._flush_line(entry)
+            self._stack.pop()
+            self._begin_segment()
+        return self._app_tracer
+    
+    def _on_library_event(self, frame, event, arg):
+        if event == "return":
+            self._in_call = False
+            returned = tracemalloc.get_traced_memory()[0] - self._call_start
+            if isinstance(arg, tuple) and returned <= 0:
+                # Brush and size tuples often come from CPython's free list, which
+                # tracemalloc cannot see; the badge allocates a fresh object
+                returned = sys.getsizeof(arg)
+            if returned > 0 and self._stack:
+                self._stack[-1][1] += returned
+            self._begin_segment()
+        return self._library_tracer
+    
+    # -- reporting ---------------------------------------------------------------
+    
+    def _end_frame(self, after, before):
+        app = self.current_app
+        totals = self.apps.setdefault(app, {"frames": 0, "allocs": 0, "bytes": 0, "kept_blocks": 0, "kept_bytes": 0})
+        totals["frames"] += 1
+        for site, (allocs, allocated) in self._frame.items():
+            entry = self.sites.setdefault((app, site), [0, 0, 0, 0])
+            entry[0] += allocs
+            entry[1] += allocated
+            totals["allocs"] += allocs
+            totals["bytes"] += allocated
+        for tb in after.keys() | before.keys():
+            count, size = after.get(tb, (0, 0))
+            before_count, before_size = before.get(tb, (0, 0))
+            count -= before_count
+            size -= before_size
+            if not count and not size:
+                continue
+            # Skip the simulator's own caches and dirty-rect bookkeeping
+            if tb[-1].filename == __file__:
+                continue
+            # Attribute to the innermost app frame (tracebacks list the oldest first)
+            for frame in reversed(tb):
+                if self._app_file(frame.filename):
+                    site = (frame.filename, frame.lineno)
+                    break
+            else:
+                continue
+            entry = self.sites.setdefault((app, site), [0, 0, 0, 0])
+            entry[2] += count
+            entry[3] += size
+            totals["kept_blocks"] += count
+            totals["kept_bytes"] += size
+        self._frame = {}
+    
+    def report(self, top=10):
+        """Print per-app per-frame allocation averages and the worst app lines."""
+        for app, totals in self.apps.items():
+            frames = totals["frames"]
+            if not frames:
+                continue
+            print(f"\n[Alloc] {app}: {frames} frames | per frame: "
+                  f"{totals['allocs'] / frames:.1f} allocs, "
+                  f"{totals['bytes'] / frames / 1024:.2f}KB, "
+                  f"kept {totals['kept_blocks'] / frames:+.1f} blocks "
+                  f"({totals['kept_bytes'] / frames:+.0f} B)")
+            rows = [(site, v) for (a, site), v in self.sites.items() if a == app]
+            rows.sort(key=lambda row: (row[1][0], row[1][1]), reverse=True)
+            print(f"  {'Allocs/f':>9} {'B/f':>8} {'Kept/f':>7} {'KeptB/f':>8}  Site")
+            for site, (allocs, allocated, kept, kept_bytes) in rows[:top]:
+                print(f"  {allocs / frames:>9.1f} {allocated / frames:>8.0f} {kept / frames:>+7.1f} "
+                      f"{kept_bytes / frames:>+8.0f}  {_site_label(*site, self._names.get(site))}")
+
+
+class StartupProfiler:
+    """Time everything between loading an app and its first frame reaching the screen.
+
+    While an app is starting, `builtins.__import__` is wrapped so every module that
+    actually executes (not already in `sys.modules`) becomes a span, nested under
+    whatever imported it, and so do `Image.load`, `SpriteSheet` and `PixelFont.load`.
+    `run()` adds spans for `init()` and the first `update()`/`present()`.
+    """
+    
+    BAR_WIDTH = 32
+    
+    def __init__(self):
+        self.launches = []  # (app, [(start_ms, ms, depth, label)], total_ms)
+        self.current_app = None
+        self._spans = None
+        self._t0 = 0.0
+        self._depth = 0
+        self._update_end = None
+        self._real_import = None
+        self._originals = []
+    
+    @property
+    def pending(self):
+        """True until the current app has presented its first frame."""
+        return self._spans is not None
+    
+    def install(self):
+        """Wrap `__import__` and the asset loaders."""
+        self._real_import = builtins.__import__
+        builtins.__import__ = self._import
+        for cls, name, label in ((Image, "load", "Image.load"),
+                                 (PixelFont, "load", "PixelFont.load"),
+                                 (SpriteSheet, "__init__", "SpriteSheet")):
+            func = cls.__dict__[name]
+            self._originals.append((cls, name, func))
+            setattr(cls, name, self._wrap_loader(func, label))
+    
+    def uninstall(self):
+        """Restore `__import__` and the asset loaders."""
+        if self._real_import is not None:
+            builtins.__import__ = self._real_import
+            self._real_import = None
+        for cls, name, func in reversed(self._originals):
+            setattr(cls, name, func)
+        self._originals = []
+    
+    def begin_app(self, name):
+        """Start the clock for a newly loaded app."""
+        self._finish()
+        self.current_app = name
+        self._spans = []
+        self._depth = 0
+        self._update_end = None
+        self._t0 = time.perf_counter()
+    
+    def measure(self, label, func, *args, **kwargs):
+        """Call `func` and record it as a span while the app is starting."""
+        if self._spans is None:
+            return func(*args, **kwargs)
+        start = time.perf_counter()
+        depth = self._depth
+        self._depth += 1
+        try:
+            return func(*args, **kwargs)
+        finally:
+            self._depth = depth
+            self._record(start, depth, label)
+    
+    def trace_update(self, update_func):
+        """Record the first update() call; later frames pass straight through."""
+        if self._spans is None:
+            return update_func()
+        result = self.measure("first update()", update_func)
+        self._update_end = time.perf_counter()
+        return result
+    
+    def presented(self):
+        """Close the startup waterfall once the first frame has been presented."""
+        if self._spans is None or self._update_end is None:
+            return
+        self._record(self._update_end, 0, "first present()")
+        self._finish()
+    
+    def _record(self, start, depth, label):
+        now = time.perf_counter()
+        self._spans.append(((start - self._t0) * 1000.0, (now - start) * 1000.0, depth, label))
+    
+    def _finish(self):
+        if self._spans is None:
+            return
+        total = max((start + ms for start, ms, _, _ in self._spans), default=0.0)
+        self.launches.append((self.current_app, self._spans, total))
+        self._spans = None
+    
+    def _import(self, name, globals=None, locals=None, fromlist=(), level=0):
+        real_import = self._real_import
+        if self._spans is None:
+            return real_import(name, globals, locals, fromlist, level)
+        resolved = name
+        if level:
+            try:
+                resolved = importlib.util.resolve_name("." * level + name, (globals or {}).get("__package__"))
+            except (ImportError, ValueError):
+                pass
+        if resolved in sys.modules:
+            return real_import(name, globals, locals, fromlist, level)
+        return self.measure(f"import {resolved}", real_import, name, globals, locals, fromlist, level)
+    
+    def _wrap_loader(self, func, label):
+        profiler = self
+        
+        def wrapper(*args, **kwargs):
+            if profiler._spans is None:
+                return func(*args, **kwargs)
+            # SpriteSheet.__init__ takes the instance first; the loaders take the path
+            path = args[1] if label == "SpriteSheet" else args[0]
+            return profiler.measure(f"{label}({_sim_relpath(map_system_path(path))})", func, *args, **kwargs)
+        
+        return wrapper
+    
+    def report(self):
+        """Print a waterfall of each app launch, from module import to first frame."""
+        self._finish()
+        for app, spans, total in self.launches:
+            print(f"\n[Startup] {app}: {total:.1f}ms to first frame")
+            print(f"  {'Start':>8} {'ms':>8}  {'Step':<44} Timeline")
+            scale = self.BAR_WIDTH / total if total > 0 else 0.0
+            for start, ms, depth, label in sorted(spans, key=lambda span: (span[0], span[2])):
+                step = "  " * depth + label
+                if len(step) > 44:
+                    step = step[:43] + "…"
+                offset = int(start * scale)
+                bar = " " * offset + "█" * max(1, int(round(ms * scale)))
+                print(f"  {start:>8.1f} {ms:>8.1f}  {step:<44} |{bar[:self.BAR_WIDTH]:<{self.BAR_WIDTH}}|")
+
+
+class DeviceCostModel:
+    """Estimate how long each frame would take on the badge's RP2350.
+
+    Host FPS says little about the badge. Every badgeware primitive is charged
+    an estimated device cost from the work it does: pixels cleared or filled,
+    shape vertices, glyphs drawn, blit area and scaling. Each call app code
+    makes during update() is charged interpreter overhead. The constants are
+    first-order figures for MicroPython on a 200 MHz RP2350 with badgeware's
+    software rasterizer; adjust the class attributes to calibrate them.
+    Pure-Python work that makes no calls (arithmetic in tight loops) is not
+    charged, so treat the result as a lower bound.
+    """
+    
+    METHODS = ("clear", "draw", "blit", "scale_blit", "text")
+    
+    # Interpreter overhead per call made from app code (microseconds)
+    PYTHON_CALL_US = 8.0     # into another Python function: frame setup, argument binding
+    NATIVE_CALL_US = 2.0     # into a builtin or badgeware (C) function
+    # Primitive costs
+    CLEAR_NS_PER_PX = 4.0
+    DRAW_SETUP_US = 6.0
+    VERTEX_US = 0.8          # transform and edge setup per vertex
+    FILL_NS_PER_PX = 12.0    # solid span fill per covered pixel
+    ANTIALIAS_FACTOR = 2.0   # coverage sampling when antialias is enabled
+    BLIT_SETUP_US = 5.0
+    BLIT_NS_PER_PX = 20.0    # alpha-blended copy
+    SCALE_NS_PER_PX = 35.0   # sample and blend per destination pixel
+    GLYPH_US = 4.0
+    TEXT_NS_PER_PX = 15.0
+    # Framebuffer conversion before it is handed to the display each frame
+    PRESENT_US = 1500.0
+    # Fraction of the bounding box a filled shape covers
+    COVERAGE = {"_Circle": 0.79, "_Squircle": 0.9, "_RegularPolygon": 0.7, "_Pie": 0.5}
+    
+    CATEGORIES = ("calls", "clear", "shapes", "blits", "text", "present")
+    
+    def __init__(self):
+        self.current_app = None
+        self.samples = {}  # app -> list of estimated frame times in ms
+        self.breakdown = {}  # app -> {category: total us}
+        self._frame = dict.fromkeys(self.CATEGORIES, 0.0)
+        self._recent = []
+        self._is_app = {}
+        self._originals = []
+        self._profiler = self._on_profile
+    
+    def install(self):
+        """Wrap the badgeware drawing methods so each call is charged."""
+        for cls in (_SurfaceTarget, _Window):
+            for name in self.METHODS:
+                func = cls.__dict__[name]
+                self._originals.append((cls, name, func))
+                setattr(cls, name, self._wrap(func, getattr(self, "_cost_" + name)))
+    
+    def uninstall(self):
+        """Restore the original drawing methods."""
+        for cls, name, func in reversed(self._originals):
+            setattr(cls, name, func)
+        self._originals = []
+    
+    def _wrap(self, func, cost):
+        model = self
+        
+        def wrapper(target, *args, **kwargs):
+            target._last_rect = None
+            result = func(target, *args, **kwargs)
+            category, us = cost(target, target._last_rect, *args, **kwargs)
+            model._frame[category] += us
+            return result
+        
+        wrapper.__name__ = func.__name__
+        wrapper.__doc__ = func.__doc__
+        return wrapper
+    
+    # -- primitive costs (target, rect written, original arguments) -> (category, us)
+    
+    @staticmethod
+    def _area(rect):
+        return rect.width * rect.height if isinstance(rect, pygame.Rect) else 0
+    
+    @staticmethod
+    def _antialias(target):
+        parent = getattr(target, "_parent", target)
+        return bool(getattr(parent, "antialias", 0))
+    
+    def _cost_clear(self, target, rect, color=None):
+        return "clear", self._area(rect) * self.CLEAR_NS_PER_PX / 1000.0
+    
+    def _cost_draw(self, target, rect, shape):
+        base = shape.shape if isinstance(shape, _StrokedShape) else shape
+        vertices = self._vertices(base)
+        area = self._area(rect)
+        if isinstance(shape, _StrokedShape) or isinstance(base, (_Line, _Arc)) and not isinstance(base, _Pie):
+            # Outlines cover a band around the edge, not the whole bounding box
+            width = shape.width if isinstance(shape, _StrokedShape) else base.thickness
+            if isinstance(base, _Line):
+                length = math.hypot(base.x2 - base.x1, base.y2 - base.y1)
+            elif isinstance(base, _Arc):
+                length = base.radius * math.radians(base._sweep()[1])
+            elif isinstance(rect, pygame.Rect):
+                length = 2 * (rect.width + rect.height)
+            else:
+                length = 0
+            pixels = min(area, length * max(1.0, width))
+        else:
+            pixels = area * self.COVERAGE.get(type(base).__name__, 1.0)
+        fill = pixels * self.FILL_NS_PER_PX / 1000.0
+        if self._antialias(target):
+            fill *= self.ANTIALIAS_FACTOR
+        return "shapes", self.DRAW_SETUP_US + vertices * self.VERTEX_US + fill
+    
+    @staticmethod
+    def _vertices(shape):
+        if isinstance(shape, _Line):
+            return 2
+        if isinstance(shape, _RoundedRectangle):
+            return sum(max(4, int(min(r, shape.w / 2.0, shape.h / 2.0) * 2)) if r > 0 else 1
+                       for r in shape.radii)
+        if isinstance(shape, _Rectangle):
+            return 4
+        if isinstance(shape, (_Circle, _Squircle)):
+            return shape.segments
+        if isinstance(shape, _RegularPolygon):
+            return shape.sides
+        if isinstance(shape, _Arc):
+            return shape._sweep()[2] + 1
+        return 4
+    
+    def _cost_blit(self, target, rect, image, x, y, transform=None):
+        return "blits", self.BLIT_SETUP_US + self._area(rect) * self.BLIT_NS_PER_PX / 1000.0
+    
+    def _cost_scale_blit(self, target, rect, image, x, y, w, h, transform=None):
+        return "blits", self.BLIT_SETUP_US + self._area(rect) * self.SCALE_NS_PER_PX / 1000.0
+    
+    def _cost_text(self, target, rect, text, x, y):
+        glyphs = sum(1 for ch in str(text) if not ch.isspace())
+        return "text", glyphs * self.GLYPH_US + self._area(rect) * self.TEXT_NS_PER_PX / 1000.0
+    
+    # -- interpreter overhead ----------------------------------------------------
+    
+    def _app_file(self, path):
+        is_app = self._is_app.get(path)
+        if is_app is None:
+            root = SIM_ROOT or os.getcwd()
+            # Frozen stdlib modules report names like "<frozen posixpath>", which
+            # abspath() would place under an app's working directory
+            is_app = (path != __file__ and os.path.isabs(path)
+                      and path.startswith(root + os.sep))
+            self._is_app[path] = is_app
+        return is_app
+    
+    def _on_profile(self, frame, event, arg):
+        if event == "call":
+            caller = frame.f_back
+            if caller is not None and self._app_file(caller.f_code.co_filename):
+                # Badgeware functions are native on the badge
+                if frame.f_code.co_filename == __file__:
+                    self._frame["calls"] += self.NATIVE_CALL_US
+                else:
+                    self._frame["calls"] += self.PYTHON_CALL_US
+        elif event == "c_call":
+            if self._app_file(frame.f_code.co_filename):
+                self._frame["calls"] += self.NATIVE_CALL_US
+    
+    def trace(self, update_func):
+        """Call update_func() while counting the calls app code makes."""
+        previous = sys.getprofile()
+        sys.setprofile(self._profiler)
+        try:
+            return update_func()
+        finally:
+            sys.setprofile(previous)
+    
+    # -- frames and reporting ------------------------------------------------------
+    
+    def begin_app(self, name):
+        """Start attributing estimates to a newly loaded app."""
+        self.current_app = name
+        self.samples.setdefault(name, [])
+        self.breakdown.setdefault(name, dict.fromkeys(self.CATEGORIES, 0.0))
+    
+    def end_frame(self):
+        """Close the frame: add the present cost, record and return the estimate in ms."""
+        frame = self._frame
+        frame["present"] += self.PRESENT_US
+        total_ms = sum(frame.values()) / 1000.0
+        self.samples.setdefault(self.current_app, []).append(total_ms)
+        totals = self.breakdown.setdefault(self.current_app, dict.fromkeys(self.CATEGORIES, 0.0))
+        for category, us in frame.items():
+            totals[category] += us
+        self._recent.append(total_ms)
+        self._frame = dict.fromkeys(self.CATEGORIES, 0.0)
+        return total_ms
+    
+    def take_average(self):
+        """Mean estimated frame time since the last call (None if no frames ran)."""
+        recent, self._recent = self._recent, []
+        if not recent:
+            return None
+        return sum(recent) / len(recent)
+    
+    def report(self):
+        """Print per-app estimated device frame times and where they go."""
+        rows = [(app, times) for app, times in self.samples.items() if times]
+        if not rows:
+            return
+        print("\n[Device] estimated RP2350 frame time (ms)")
+        print(f"{'App':<16} {'Frames':>7} {'Mean':>8} {'p95':>8} {'Max':>8} {'~FPS':>6}  "
+              + " ".join(f"{c:>7}" for c in self.CATEGORIES))
+        for app, times in rows:
+            ordered = sorted(times)
+            mean = sum(ordered) / len(ordered)
+            fps = min(60.0, 1000.0 / mean) if mean > 0 else 60.0
+            totals = self.breakdown.get(app, {})
+            shares = " ".join(f"{totals.get(c, 0.0) / 1000.0 / len(ordered):>7.2f}" for c in self.CATEGORIES)
+            print(f"{str(app):<16} {len(ordered):>7} {mean:>8.2f} {FrameTimer._percentile(ordered, 95):>8.2f} "
+                  f"{ordered[-1]:>8.2f} {fps:>6.1f}  {shares}")
+
+
 class PerformanceMonitor:
     """Track and display CPU, memory usage, and badge asset estimates."""
     
-    def __init__(self, enabled=False):
+    # Upper edges (ms) of the frame-time histogram buckets written by --perf-out
+    HISTOGRAM_BINS_MS = (1.0, 2.0, 4.0, 8.0, 16.67, 25.0, 33.33, 50.0, 100.0)
+    
+    def __init__(self, enabled=False, out_path=None):
         self.enabled = enabled
         if enabled:
             import psutil
@@ -1666,6 +4045,101 @@ class PerformanceMonitor:
             self.initial_memory = None   # Track memory at first measurement
             self.peak_memory = 0         # Track peak memory growth
             self.asset_tracker = AssetTracker()  # Track loaded assets
+            # --perf-out: every frame is kept, grouped into one segment per app run
+            self.out_path = out_path
+            self.started = time.perf_counter()
+            self.frames = []     # (frame, segment, t, frame_ms, update_ms, device_ms, asset_kb, rss_growth_kb)
+            self.segments = []
+            self.growth_kb = 0.0
+    
+    def begin_app(self, name):
+        """Start a new segment; every app launch or switch gets its own."""
+        if not self.enabled:
+            return
+        self.last_time = None
+        self.segments.append({
+            "index": len(self.segments),
+            "app": name,
+            "start_frame": len(self.frames),
+            "frames": 0,
+            "peak_asset_kb": 0.0,
+            "peak_rss_growth_kb": 0.0,
+        })
+    
+    def record_frame(self, update_ms=None, device_ms=None):
+        """Keep one frame's timings for --perf-out."""
+        if not self.enabled or self.out_path is None:
+            return
+        now = time.perf_counter()
+        frame_ms = (now - self.last_time) * 1000.0 if self.last_time is not None else None
+        self.last_time = now
+        if not self.segments:
+            self.begin_app(None)
+        segment = self.segments[-1]
+        asset_kb = self.asset_tracker.get_total_kb()
+        segment["frames"] += 1
+        segment["peak_asset_kb"] = max(segment["peak_asset_kb"], asset_kb)
+        segment["peak_rss_growth_kb"] = max(segment["peak_rss_growth_kb"], self.growth_kb)
+        segment["images"] = len(self.asset_tracker.images)
+        segment["fonts"] = len(self.asset_tracker.fonts)
+        segment["largest_image_kb"] = self.asset_tracker.get_largest_image_kb()
+        self.frames.append((len(self.frames), segment["index"], now - self.started,
+                            frame_ms, update_ms, device_ms, asset_kb, self.growth_kb))
+    
+    @classmethod
+    def _histogram(cls, values):
+        """Count values into HISTOGRAM_BINS_MS buckets as [[low, high, count], ...]."""
+        counts = [0] * (len(cls.HISTOGRAM_BINS_MS) + 1)
+        for value in values:
+            for i, edge in enumerate(cls.HISTOGRAM_BINS_MS):
+                if value < edge:
+                    counts[i] += 1
+                    break
+            else:
+                counts[-1] += 1
+        lows = (0.0,) + cls.HISTOGRAM_BINS_MS
+        highs = cls.HISTOGRAM_BINS_MS + (None,)
+        return [[low, high, count] for low, high, count in zip(lows, highs, counts)]
+    
+    FRAME_COLUMNS = ("frame", "segment", "t", "frame_ms", "update_ms", "device_ms", "asset_kb", "rss_growth_kb")
+    
+    def write(self, path=None):
+        """Write the recorded frames and segments as JSON, or per-frame rows as CSV."""
+        path = path or self.out_path
+        if not self.enabled or not path:
+            return
+        if path.lower().endswith(".csv"):
+            import csv
+            with open(path, "w", newline="", encoding="utf-8") as f:
+                writer = csv.writer(f)
+                writer.writerow(self.FRAME_COLUMNS + ("app",))
+                for row in self.frames:
+                    writer.writerow(["" if v is None else (round(v, 4) if isinstance(v, float) else v)
+                                     for v in row] + [self.segments[row[1]]["app"]])
+        else:
+            segments = []
+            for segment in self.segments:
+                rows = self.frames[segment["start_frame"]:segment["start_frame"] + segment["frames"]]
+                entry = dict(segment)
+                for column in ("frame_ms", "update_ms", "device_ms"):
+                    index = self.FRAME_COLUMNS.index(column)
+                    values = [row[index] for row in rows if row[index] is not None]
+                    if values:
+                        entry[column + "_histogram"] = self._histogram(values)
+                segments.append(entry)
+            data = {
+                "version": 1,
+                "args": sys.argv[1:],
+                "created": time.strftime("%Y-%m-%dT%H:%M:%S"),
+                "histogram_bins_ms": list(self.HISTOGRAM_BINS_MS),
+                "peak_rss_growth_kb": self.peak_memory,
+                "segments": segments,
+                "columns": list(self.FRAME_COLUMNS),
+                "frames": [[round(v, 4) if isinstance(v, float) else v for v in row] for row in self.frames],
+            }
+            with open(path, "w", encoding="utf-8") as f:
+                json.dump(data, f, separators=(",", ":"))
+        print(f"[Simulator] Performance data written to {path} ({len(self.frames)} frames)")
     
     def set_baseline(self):
         """Set the baseline memory after app loads and first frame renders."""
@@ -1675,12 +4149,13 @@ class PerformanceMonitor:
             self.initial_memory = self.baseline_memory
             self.peak_memory = 0
     
-    def update(self, clock):
+    def update(self, clock, update_ms=None, device_ms=None):
         """Update and display performance metrics."""
         if not self.enabled:
             return
         
-        import time
+        self.record_frame(update_ms, device_ms)
+        
         current_time = time.time()
         
         # Only update display at specified interval
@@ -1708,8 +4183,9 @@ class PerformanceMonitor:
         badge_frame_budget_ms = 16.67
         frame_budget_percent = (frame_time_ms / badge_frame_budget_ms) * 100
         
-        # Get CPU usage (percentage for this process)
-        cpu_percent = self.process.cpu_percent(interval=0.1)
+        # Get CPU usage (percentage for this process); non-blocking so the
+        # sample does not stall the frame it is taken in
+        cpu_percent = self.process.cpu_percent(interval=None)
         
         # Get memory usage
         mem_info = self.process.memory_info()
@@ -1720,6 +4196,7 @@ class PerformanceMonitor:
         memory_growth_kb = memory_growth_mb * 1024
         
         # Track peak growth
+        self.growth_kb = memory_growth_kb
         if memory_growth_kb > self.peak_memory:
             self.peak_memory = memory_growth_kb
         
@@ -1752,10 +4229,29 @@ class PerformanceMonitor:
         else:
             cpu_status = " ✓"
         
+        # Text cache effectiveness (rendered surfaces and metrics)
+        text_hit_rate = _text_cache.hit_rate()
+        
+        # Image surface copies skipped thanks to copy-on-write loading
+        copies_avoided = Image.copies_avoided
+        
+        # Estimated frame time on the badge itself, from the device cost model
+        device_ms = _device_model.take_average() if _device_model else None
+        if device_ms is None:
+            device = ""
+        elif device_ms > badge_frame_budget_ms * 1.5:
+            device = f" Device~{device_ms:5.1f}ms ⚠️  Slow!"
+        elif device_ms > badge_frame_budget_ms:
+            device = f" Device~{device_ms:5.1f}ms ⚡"
+        else:
+            device = f" Device~{device_ms:5.1f}ms ✓"
+        
         # Display with both Python memory and badge estimates
-        print(f"\r[Perf] FPS:{fps:5.1f} Frame:{frame_time_ms:5.1f}ms{cpu_status} | "
+        print(f"\r[Perf] FPS:{fps:5.1f} Frame:{frame_time_ms:5.1f}ms{cpu_status}{device} | "
               f"Badge~{estimated_badge_kb:5.1f}KB{warning} | "
-              f"Imgs:{image_count}({largest_image_kb:5.1f}KB) Fonts:{font_count}", 
+              f"Imgs:{image_count}({largest_image_kb:5.1f}KB) Fonts:{font_count} | "
+              f"Text:{text_hit_rate:3.0f}% hit ({_text_cache.misses} renders) | "
+              f"CoW:{copies_avoided} copies avoided", 
               end='', flush=True)
 
 # -----------------------------------------------------------------------------
@@ -1779,6 +4275,20 @@ def main() -> None:
         metavar="DIR",
         help="Directory to save screenshots (press F12 to capture).",
     )
+    parser.add_argument(
+        "--record-video",
+        dest="record_video",
+        metavar="PATH",
+        help="Record every frame to PATH: a .gif file (needs Pillow) or a directory of PNG frames.",
+    )
+    parser.add_argument(
+        "--record-buffer",
+        dest="record_buffer",
+        type=int,
+        default=_capture.max_frames,
+        metavar="N",
+        help=f"Frames --record-video may queue for encoding before dropping new ones (default: {_capture.max_frames}).",
+    )
     parser.add_argument(
         "--clean",
         action="store_true",
@@ -1789,8 +4299,185 @@ def main() -> None:
         action="store_true",
         help="Show live performance metrics (CPU and memory usage) in terminal.",
     )
+    parser.add_argument(
+        "--perf-out",
+        dest="perf_out",
+        metavar="FILE",
+        help="Write per-frame timings, histograms and per-app memory to FILE (.json or .csv) on exit (implies --perf).",
+    )
+    parser.add_argument(
+        "--headless",
+        action="store_true",
+        help="Run without a window (offscreen SDL driver) and with no frame-rate cap.",
+    )
+    parser.add_argument(
+        "--frames",
+        type=int,
+        metavar="N",
+        help="Stop after N frames and print per-app update() timings.",
+    )
+    parser.add_argument(
+        "--virtual-clock",
+        dest="tick_step_ms",
+        type=float,
+        nargs="?",
+        const=1000.0 / 60.0,
+        metavar="MS",
+        help="Advance io.ticks by a fixed MS per frame instead of wall-clock time (default step: 16.67).",
+    )
+    parser.add_argument(
+        "--seed",
+        type=int,
+        metavar="N",
+        help="Seed random/urandom with N each time an app is loaded.",
+    )
+    parser.add_argument(
+        "--task-budget",
+        dest="task_budget",
+        type=float,
+        default=_scheduler.budget_ms,
+        metavar="MS",
+        help=f"Time spawned tasks may run each frame (default: {_scheduler.budget_ms:g}).",
+    )
+    parser.add_argument(
+        "--threads",
+        type=int,
+        default=_core_pool.workers,
+        metavar="N",
+        help=f"Worker threads for _thread and fetch_async (default: {_core_pool.workers}, the RP2350's second core).",
+    )
+    parser.add_argument(
+        "--hot-reload",
+        dest="hot_reload",
+        action="store_true",
+        help="Reload the running app when a file in its directory changes, without restarting the simulator.",
+    )
+    parser.add_argument(
+        "--reset-state",
+        dest="reset_state",
+        action="store_true",
+        help="With --hot-reload, undo the app's State.save() calls on each reload (implies --hot-reload).",
+    )
+    parser.add_argument(
+        "--state-dir",
+        dest="state_dir",
+        metavar="DIR",
+        help="Keep apps' saved State in DIR instead of .badge_state in the system root "
+             "(default with --replay: a new temporary directory).",
+    )
+    parser.add_argument(
+        "--ram-kb",
+        dest="ram_kb",
+        type=int,
+        metavar="KB",
+        help="Limit decoded images to KB of simulated badge RAM; raise MemoryError beyond it.",
+    )
+    parser.add_argument(
+        "--profile",
+        action="store_true",
+        help="Count and time badgeware draw calls per app source line; print a summary at exit.",
+    )
+    parser.add_argument(
+        "--profile-trace",
+        dest="profile_trace",
+        metavar="FILE",
+        help="Write one JSON line of draw-call stats per frame to FILE (implies --profile).",
+    )
+    parser.add_argument(
+        "--device-estimate",
+        dest="device_estimate",
+        action="store_true",
+        help="Estimate each frame's time on the badge's RP2350 from the work it does (shown live by --perf).",
+    )
+    parser.add_argument(
+        "--alloc-trace",
+        dest="alloc_trace",
+        action="store_true",
+        help="Trace memory allocated by each update() call per app source line; print a summary at exit.",
+    )
+    parser.add_argument(
+        "--startup-profile",
+        dest="startup_profile",
+        action="store_true",
+        help="Time imports, asset loads, init() and the first frame of each app; print a waterfall at exit.",
+    )
+    http_group = parser.add_mutually_exclusive_group()
+    http_group.add_argument(
+        "--http-record",
+        dest="http_record",
+        metavar="DIR",
+        help="Save every HTTP response the app fetches to DIR as a fixture.",
+    )
+    http_group.add_argument(
+        "--http-replay",
+        dest="http_replay",
+        metavar="DIR",
+        help="Serve HTTP responses from fixtures in DIR instead of the network.",
+    )
+    parser.add_argument(
+        "--http-latency",
+        dest="http_latency",
+        type=float,
+        default=0.0,
+        metavar="MS",
+        help="Delay every HTTP request by MS before the response arrives.",
+    )
+    parser.add_argument(
+        "--http-jitter",
+        dest="http_jitter",
+        type=float,
+        default=0.0,
+        metavar="MS",
+        help="Vary each request's latency randomly by up to +/- MS.",
+    )
+    parser.add_argument(
+        "--http-bandwidth",
+        dest="http_bandwidth",
+        type=float,
+        metavar="KBITS",
+        help="Limit HTTP response bodies to KBITS kilobits per second.",
+    )
+    parser.add_argument(
+        "--http-stalls",
+        dest="http_stalls",
+        type=float,
+        default=0.0,
+        metavar="PCT",
+        help="Stall PCT percent of response reads, as if a packet was lost.",
+    )
+    parser.add_argument(
+        "--http-stall-ms",
+        dest="http_stall_ms",
+        type=float,
+        default=1000.0,
+        metavar="MS",
+        help="How long each --http-stalls stall lasts (default: 1000).",
+    )
+    input_group = parser.add_mutually_exclusive_group()
+    input_group.add_argument(
+        "--record",
+        dest="record_path",
+        metavar="FILE",
+        help="Record button input to FILE from the first frame (F9 also toggles recording).",
+    )
+    input_group.add_argument(
+        "--replay",
+        dest="replay_path",
+        metavar="FILE",
+        help="Replay button input recorded in FILE (F10 also toggles replay).",
+    )
     args = parser.parse_args()
     
+    # Replays start from empty app state so they repeat exactly, and leave the saved state alone
+    if args.state_dir:
+        State.directory = os.path.abspath(args.state_dir)
+    elif args.replay_path:
+        import atexit
+        import shutil
+        import tempfile
+        State.directory = tempfile.mkdtemp(prefix="badge_state_")
+        atexit.register(shutil.rmtree, State.directory, ignore_errors=True)
+    
     # Clean temporary files if requested
     if args.clean:
         import tempfile
@@ -1805,10 +4492,10 @@ def main() -> None:
     
     # Initialize performance monitoring
     global _perf_monitor
-    if args.perf:
+    if args.perf or args.perf_out:
         try:
             import psutil  # type: ignore
-            _perf_monitor = PerformanceMonitor(enabled=True)
+            _perf_monitor = PerformanceMonitor(enabled=True, out_path=args.perf_out)
             print("[Simulator] Performance monitoring enabled")
         except ImportError:
             print("[Simulator] Warning: psutil not installed. Install with 'pip install psutil' to enable --perf")
@@ -1817,11 +4504,79 @@ def main() -> None:
     else:
         _perf_monitor = None
 
+    # Headless benchmark mode: no window, no frame cap, timed update() calls
+    global _headless, _frame_timer, _random_seed, _draw_profiler, _alloc_tracer, _device_model, _startup_profiler
+    global _app_watcher
+    _headless = args.headless
+    _random_seed = args.seed
+    _scheduler.budget_ms = args.task_budget
+    _capture.max_frames = max(1, args.record_buffer)
+    if args.record_video:
+        if args.record_video.lower().endswith(".gif") and _PILImage is None:
+            print("Recording a GIF needs Pillow. Install with 'pip install pillow', "
+                  "or give a directory to record PNG frames.", file=sys.stderr)
+            sys.exit(2)
+        _capture.start_video(args.record_video)
+    _core_pool.workers = max(1, args.threads)
+    if args.headless:
+        os.environ["SDL_VIDEODRIVER"] = "dummy"
+        os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+    if args.headless or args.frames is not None:
+        _frame_timer = FrameTimer(limit=args.frames)
+    if args.ram_kb is not None:
+        Image._cache.budget_bytes = args.ram_kb * 1024
+    if args.profile or args.profile_trace:
+        _draw_profiler = DrawProfiler(trace_path=args.profile_trace)
+        _draw_profiler.install()
+    if args.alloc_trace:
+        _alloc_tracer = AllocTracer()
+        _alloc_tracer.install()
+    # Only when asked for: its profile hook slows the host frame times --perf reports
+    if args.device_estimate:
+        _device_model = DeviceCostModel()
+        _device_model.install()
+    if args.startup_profile:
+        _startup_profiler = StartupProfiler()
+        _startup_profiler.install()
+    
+    # HTTP fixtures and link shaping for the urequest mock
+    global _http_fixtures, _http_link
+    if args.http_record:
+        _http_fixtures = _HttpFixtures(args.http_record, "record")
+    elif args.http_replay:
+        if not os.path.isdir(args.http_replay):
+            print(f"HTTP fixture directory '{args.http_replay}' does not exist.", file=sys.stderr)
+            sys.exit(2)
+        _http_fixtures = _HttpFixtures(args.http_replay, "replay")
+    if args.http_latency or args.http_jitter or args.http_bandwidth or args.http_stalls:
+        _http_link = _LinkShaper(
+            latency_ms=args.http_latency,
+            bandwidth_kbps=args.http_bandwidth,
+            jitter_ms=args.http_jitter,
+            stall_pct=args.http_stalls,
+            stall_ms=args.http_stall_ms,
+            seed=args.seed,
+        )
+
     pygame.init()
 
     global screen, io, SIM_ROOT
-    screen = Screen(scale=args.scale, screenshot_dir=args.screenshot_dir)
-    io = IO()
+    screen = Screen(scale=args.scale, screenshot_dir=args.screenshot_dir, headless=args.headless)
+    io = IO(tick_step_ms=args.tick_step_ms)
+    io.recorder = InputRecorder(args.record_path or args.replay_path)
+    if args.replay_path:
+        try:
+            io.recorder.start_replay(io)
+        except (OSError, ValueError) as e:
+            print(f"Could not load input recording '{args.replay_path}': {e}", file=sys.stderr)
+        if not io.recorder.replaying:
+            pygame.quit()
+            sys.exit(2)
+        # A headless replay runs exactly as long as the recording unless told otherwise
+        if _frame_timer and _frame_timer.limit is None:
+            _frame_timer.limit = io.recorder.length
+    elif args.record_path:
+        io.recorder.start_recording()
     
     # Set system root with default to ./badge relative to simulator
     if args.system_root:
@@ -1867,9 +4622,31 @@ def main() -> None:
             game_dir = os.path.dirname(os.path.abspath(game_path))
             app_name = os.path.basename(game_dir)
         
+        # --hot-reload watches the directory of whichever app is running
+        if args.hot_reload or args.reset_state:
+            if _app_watcher is None or _app_watcher.path != os.path.abspath(game_dir):
+                if _app_watcher:
+                    _app_watcher.stop()
+                _app_watcher = _AppWatcher(game_dir)
+                if args.reset_state:
+                    State._originals = {}
+        
         # Set window title with app name
         pygame.display.set_caption(f"Badge Simulator - {app_name}")
         
+        if _frame_timer:
+            _frame_timer.begin_app(app_name)
+        if _draw_profiler:
+            _draw_profiler.begin_app(app_name)
+        if _alloc_tracer:
+            _alloc_tracer.begin_app(app_name)
+        if _device_model:
+            _device_model.begin_app(app_name)
+        if _perf_monitor:
+            _perf_monitor.begin_app(app_name)
+        if _startup_profiler:
+            _startup_profiler.begin_app(app_name)
+        
         # Try to set app icon from the game's directory
         if game_dir:
             icon_path = os.path.join(game_dir, "icon.png")
@@ -1877,17 +4654,29 @@ def main() -> None:
                 screen.set_icon(icon_path)
 
         try:
-            module = load_game_module(game_path)
+            if _startup_profiler:
+                module = _startup_profiler.measure(f"load {app_name}", load_game_module, game_path)
+            else:
+                module = load_game_module(game_path)
         except SystemExit:
             raise
         except Exception as e:
             print(f"[Simulator Error] Failed to load game module: {e}", file=sys.stderr)
             traceback.print_exc()
-            pygame.quit()
-            sys.exit(1)
-
-        if not hasattr(module, "update"):
-            print("Loaded module has no 'update' function", file=sys.stderr)
+            module = None
+
+        if module is None or not hasattr(module, "update"):
+            if module is not None:
+                print("Loaded module has no 'update' function", file=sys.stderr)
+            # With --hot-reload, wait for a fix instead of exiting
+            if _app_watcher:
+                if not _app_watcher.wait():
+                    break
+                print(f"[Simulator] {_sim_relpath(_app_watcher.changed)} changed, reloading {app_name}")
+                _app_watcher.reset()
+                _unload_app(game_dir)
+                continue
+            _capture.close()
             pygame.quit()
             sys.exit(1)
 
@@ -1896,6 +4685,19 @@ def main() -> None:
             exit_func = getattr(module, "on_exit", None)
             result = run(module.update, init=init_func, on_exit=exit_func)
             
+            # Frame limit reached in benchmark mode
+            if result == "__FRAME_LIMIT__":
+                break
+            
+            # A file of the running app changed: reload it in place
+            if result == "__RELOAD__":
+                print(f"\n[Simulator] {_sim_relpath(_app_watcher.changed)} changed, reloading {app_name}")
+                _app_watcher.reset()
+                _unload_app(game_dir)
+                if args.reset_state:
+                    State.restore()
+                continue
+            
             # Check if user pressed Home button to return to menu
             if result == "__RETURN_TO_MENU__":
                 menu_path = os.path.join(SIM_ROOT, "apps", "menu")
@@ -1903,47 +4705,7 @@ def main() -> None:
                     print(f"\n[Simulator] Returning to menu")
                     current_app = menu_path
                     
-                    # Clean up sys.path entries added by the previous app
-                    if game_dir:
-                        game_dir_abs = os.path.abspath(game_dir)
-                        paths_to_remove = [p for p in sys.path if os.path.abspath(p).startswith(game_dir_abs)]
-                        for p in paths_to_remove:
-                            while p in sys.path:
-                                sys.path.remove(p)
-                    
-                    # Clean up module cache for clean reload
-                    modules_to_remove = []
-                    for mod_name, mod in sys.modules.items():
-                        if mod and hasattr(mod, "__file__") and mod.__file__:
-                            mod_file = os.path.abspath(mod.__file__)
-                            if game_dir and mod_file.startswith(game_dir):
-                                modules_to_remove.append(mod_name)
-                    
-                    for mod_name in modules_to_remove:
-                        del sys.modules[mod_name]
-                    
-                    # Also remove the main module loaded as "badge_game"
-                    if "badge_game" in sys.modules:
-                        del sys.modules["badge_game"]
-                    
-                    # Also remove common app modules that can conflict (like ui, icon)
-                    # These will be re-imported fresh when the menu loads
-                    for common_mod in ["ui", "icon", "beacon", "mona"]:
-                        if common_mod in sys.modules:
-                            del sys.modules[common_mod]
-                    
-                    # Clear image cache to simulate badge behavior (old app's images are freed)
-                    Image._cache.clear()
-                    
-                    # Reset asset tracker when returning to menu
-                    if _perf_monitor and _perf_monitor.enabled:
-                        _perf_monitor.asset_tracker.reset()
-                    
-                    # Force garbage collection to free memory
-                    import gc
-                    collected = gc.collect()
-                    if collected > 0:
-                        print(f"[Simulator] Garbage collected {collected} objects")
+                    _unload_app(game_dir)
                     
                     # Continue to next iteration to load the menu
                     continue
@@ -1959,47 +4721,7 @@ def main() -> None:
                     print(f"\n[Simulator] Launching app: {result}")
                     current_app = result_path
                     
-                    # Clean up sys.path entries added by the previous app
-                    if game_dir:
-                        game_dir_abs = os.path.abspath(game_dir)
-                        paths_to_remove = [p for p in sys.path if os.path.abspath(p).startswith(game_dir_abs)]
-                        for p in paths_to_remove:
-                            while p in sys.path:
-                                sys.path.remove(p)
-                    
-                    # Clean up module cache for clean reload
-                    # Remove all modules that were loaded from the previous app
-                    modules_to_remove = []
-                    for mod_name, mod in sys.modules.items():
-                        if mod and hasattr(mod, "__file__") and mod.__file__:
-                            mod_file = os.path.abspath(mod.__file__)
-                            if game_dir and mod_file.startswith(game_dir):
-                                modules_to_remove.append(mod_name)
-                    
-                    for mod_name in modules_to_remove:
-                        del sys.modules[mod_name]
-                    
-                    # Also remove the main module loaded as "badge_game"
-                    if "badge_game" in sys.modules:
-                        del sys.modules["badge_game"]
-                    
-                    # Also remove common app modules that can conflict (like ui, icon)
-                    for common_mod in ["ui", "icon", "beacon", "mona"]:
-                        if common_mod in sys.modules:
-                            del sys.modules[common_mod]
-                    
-                    # Clear image cache to simulate badge behavior (old app's images are freed)
-                    Image._cache.clear()
-                    
-                    # Reset asset tracker when switching apps
-                    if _perf_monitor and _perf_monitor.enabled:
-                        _perf_monitor.asset_tracker.reset()
-                    
-                    # Force garbage collection to free memory
-                    import gc
-                    collected = gc.collect()
-                    if collected > 0:
-                        print(f"[Simulator] Garbage collected {collected} objects")
+                    _unload_app(game_dir)
                     
                     # Continue to next iteration to load the new app
                     continue
@@ -2015,12 +4737,44 @@ def main() -> None:
             break
         except Exception:
             traceback.print_exc()
+            if _app_watcher:
+                if not _app_watcher.wait():
+                    break
+                print(f"[Simulator] {_sim_relpath(_app_watcher.changed)} changed, reloading {app_name}")
+                _app_watcher.reset()
+                _unload_app(game_dir)
+                if args.reset_state:
+                    State.restore()
+                continue
+            _capture.close()
             pygame.quit()
             sys.exit(1)
     
     # Clean up and exit
+    if _app_watcher:
+        _app_watcher.stop()
+    _capture.close()
+    if io.recorder is not None:
+        io.recorder.stop_recording()
     if _perf_monitor and _perf_monitor.enabled:
         print()  # Newline after performance metrics
+        if args.perf_out:
+            _perf_monitor.write()
+    if _frame_timer:
+        _frame_timer.report()
+    if _device_model:
+        _device_model.uninstall()
+        if args.device_estimate:
+            _device_model.report()
+    if _draw_profiler:
+        _draw_profiler.uninstall()
+        _draw_profiler.report()
+    if _alloc_tracer:
+        _alloc_tracer.uninstall()
+        _alloc_tracer.report()
+    if _startup_profiler:
+        _startup_profiler.uninstall()
+        _startup_profiler.report()
     pygame.quit()
 
 
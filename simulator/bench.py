@@ -0,0 +1,501 @@
+"""
+bench.py
+========
+
+Benchmark every badge app in parallel with the simulator.
+
+Apps are discovered the same way the badge menu finds them: each directory
+under `apps/` with an `__init__.py`, except `menu` and `startup`. Each app is
+run headless for a fixed number of frames with scripted input in a fresh
+worker process, so nothing one app installs or patches can leak into the next
+app's measurements, and the per-app reports are collected into one table.
+
+`--save-baseline` stores the results in `perf_baseline.json`, and `--compare`
+reruns the same apps with the same frames, seed and input and flags every app
+whose allocations or draw calls per frame, estimated device frame time or
+image memory got worse by more than a threshold. These do not depend on the
+host; `--timing` adds the p95 frame time for baselines kept on one machine.
+Baseline runs never use the live network: network apps are served the
+responses recorded in `http_fixtures/`, and requests with none fail offline.
+"""
+
+import argparse
+import contextlib
+import functools
+import io as _io
+import json
+import os
+import platform
+import sys
+import tempfile
+import time
+import traceback
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor, as_completed
+
+# Workers import pygame too; keep its banner out of the output
+os.environ.setdefault("PYGAME_HIDE_SUPPORT_PROMPT", "1")
+
+SIMULATOR_DIR = os.path.dirname(os.path.abspath(__file__))
+DEFAULT_ROOT = os.path.abspath(os.path.join(SIMULATOR_DIR, "..", "badge"))
+DEFAULT_BASELINE = os.path.join(SIMULATOR_DIR, "perf_baseline.json")
+DEFAULT_HTTP_FIXTURES = os.path.join(SIMULATOR_DIR, "http_fixtures")
+
+# Simulator options that count work; they slow frames down, so baselines run them in a second pass
+COUNTING_OPTIONS = ("--device-estimate", "--profile", "--alloc-trace")
+
+# Metrics compared against the baseline: (key, title, smallest increase that counts)
+BASELINE_METRICS = (
+    ("allocs", "Alloc/f", 1.0),
+    ("calls", "Calls/f", 1.0),
+    ("device_mean", "Dev ms", 0.1),
+    ("image_kb", "Img KB", 1.0),
+)
+# Host timings vary from run to run by more than the counts do, so need a larger increase
+TIMING_METRICS = (
+    ("p95", "p95 ms", 2.0),
+)
+
+# Buttons pressed in turn by the default input script (never HOME, which would leave the app)
+SCRIPT_BUTTONS = ("A", "B", "C", "UP", "DOWN", "LEFT", "RIGHT")
+SCRIPT_START = 30   # frame of the first press
+SCRIPT_PERIOD = 20  # frames between presses
+SCRIPT_HOLD = 4     # frames each button is held
+
+
+def discover_apps(root):
+    """Return the app names the badge menu would list, sorted."""
+    apps_dir = os.path.join(root, "apps")
+    apps = []
+    for entry in os.listdir(apps_dir):
+        app_path = os.path.join(apps_dir, entry)
+        if os.path.isdir(app_path) and os.path.isfile(os.path.join(app_path, "__init__.py")):
+            # Skip menu and startup apps
+            if entry not in ("menu", "startup"):
+                apps.append(entry)
+    return sorted(apps)
+
+
+def write_input_script(path, frames):
+    """Write an input recording that presses each button in turn for `frames` frames."""
+    from badge_simulator import IO, InputRecorder
+
+    events = []
+    frame = SCRIPT_START
+    index = 0
+    while frame + SCRIPT_HOLD < frames:
+        button = getattr(IO, "BUTTON_" + SCRIPT_BUTTONS[index % len(SCRIPT_BUTTONS)])
+        bit = 1 << InputRecorder.BUTTONS.index(button)
+        events.append([frame, bit, 0])
+        events.append([frame + SCRIPT_HOLD, 0, bit])
+        frame += SCRIPT_PERIOD
+        index += 1
+    data = {
+        "version": 1,
+        "buttons": list(InputRecorder.BUTTONS),
+        "frames": frames,
+        "events": events,
+    }
+    with open(path, "w", encoding="utf-8") as fh:
+        json.dump(data, fh, separators=(",", ":"))
+
+
+def bench_app(app, root, frames, replay, seed, options):
+    """Run one app in this worker's simulator and return its row of results.
+
+    `options` are extra simulator command-line arguments. The simulator's
+    profilers, module globals and sys.modules patches are not undone
+    afterwards, so each call needs a process of its own.
+    """
+    import badge_simulator as sim
+
+    app_dir = os.path.join(root, "apps", app)
+    argv = [sim.__file__, app_dir, "-C", root, "--headless", "--frames", str(frames),
+            "--virtual-clock", "--seed", str(seed), "--replay", replay]
+    argv += list(options)
+    row = {"app": app, "error": None}
+    output = _io.StringIO()
+    saved_argv, saved_cwd = sys.argv, os.getcwd()
+    start = time.perf_counter()
+    try:
+        sys.argv = argv
+        with contextlib.redirect_stdout(output), contextlib.redirect_stderr(output):
+            sim.main()
+    except SystemExit as e:
+        if e.code not in (None, 0):
+            row["error"] = output.getvalue().strip().splitlines()[-1:] or [f"exit status {e.code}"]
+    except Exception:
+        row["error"] = traceback.format_exc().strip().splitlines()[-1:]
+    finally:
+        sys.argv = saved_argv
+        os.chdir(saved_cwd)
+    row["wall_s"] = time.perf_counter() - start
+    if row["error"]:
+        row["error"] = row["error"][0]
+
+    # The app may have launched another one; only its own frames are reported
+    timing = sim._frame_timer.summary().get(app) if sim._frame_timer else None
+    if timing:
+        row.update(timing)
+    row["image_kb"] = sim.Image._cache.peak_bytes / 1024
+    if sim._device_model and sim._device_model.samples.get(app):
+        ordered = sorted(sim._device_model.samples[app])
+        row["device_mean"] = sum(ordered) / len(ordered)
+        row["device_p95"] = sim.FrameTimer._percentile(ordered, 95)
+    if sim._draw_profiler and sim._draw_profiler.apps.get(app, {}).get("frames"):
+        totals = sim._draw_profiler.apps[app]
+        row["calls"] = totals["calls"] / totals["frames"]
+    if sim._alloc_tracer and sim._alloc_tracer.apps.get(app, {}).get("frames"):
+        totals = sim._alloc_tracer.apps[app]
+        row["allocs"] = totals["allocs"] / totals["frames"]
+    return row
+
+
+def _bench_app_in_own_process(*args):
+    # Python 3.10 has no max_tasks_per_child: give each app a one-process pool
+    with ProcessPoolExecutor(max_workers=1) as pool:
+        return pool.submit(bench_app, *args).result()
+
+
+def _fresh_process_pool(workers):
+    """Return (executor, submit) that run every bench_app() call in a new process."""
+    if sys.version_info >= (3, 11):
+        pool = ProcessPoolExecutor(max_workers=workers, max_tasks_per_child=1)
+        return pool, functools.partial(pool.submit, bench_app)
+    pool = ThreadPoolExecutor(max_workers=workers or os.cpu_count())
+    return pool, functools.partial(pool.submit, _bench_app_in_own_process)
+
+
+def run_benchmarks(apps, root, frames, inputs_dir=None, seed=0, options=(), workers=None):
+    """Benchmark `apps` in parallel and return their result rows in the order given."""
+    with tempfile.TemporaryDirectory() as tmp:
+        script = os.path.join(tmp, "script.json")
+        write_input_script(script, frames)
+        jobs = {}
+        for app in apps:
+            recording = os.path.join(inputs_dir, f"{app}.json") if inputs_dir else None
+            jobs[app] = recording if recording and os.path.isfile(recording) else script
+
+        rows = {}
+        pool, submit = _fresh_process_pool(workers)
+        with pool:
+            futures = {
+                submit(app, root, frames, replay, seed, tuple(options)): app
+                for app, replay in jobs.items()
+            }
+            for future in as_completed(futures):
+                app = futures[future]
+                try:
+                    row = future.result()
+                except Exception as e:  # the worker itself died
+                    row = {"app": app, "error": f"{type(e).__name__}: {e}"}
+                row["input"] = "script" if jobs[app] == script else os.path.basename(jobs[app])
+                rows[app] = row
+                status = row["error"] or f"{row.get('frames', 0)} frames in {row.get('wall_s', 0):.1f}s"
+                print(f"[Bench] {app}: {status}")
+    return [rows[app] for app in apps]
+
+
+def print_table(rows):
+    """Print one line per app with every metric that was collected."""
+    # (key, title, width, decimals)
+    columns = [
+        ("frames", "Frames", 7, 0),
+        ("mean", "Mean", 8, 3),
+        ("p50", "p50", 8, 3),
+        ("p95", "p95", 8, 3),
+        ("max", "Max", 8, 3),
+        ("device_mean", "Dev ms", 7, 2),
+        ("device_p95", "Dev p95", 7, 2),
+        ("calls", "Calls/f", 7, 1),
+        ("allocs", "Alloc/f", 7, 1),
+        ("image_kb", "Img KB", 7, 1),
+        ("wall_s", "Wall s", 6, 1),
+    ]
+    columns = [c for c in columns if any(c[0] in row for row in rows)]
+    print("\n[Bench] update() time per frame (ms)")
+    print(f"{'App':<16} " + " ".join(f"{title:>{width}}" for _, title, width, _ in columns))
+    for row in rows:
+        if "frames" not in row:
+            print(f"{row['app']:<16} FAILED: {row['error']}")
+            continue
+        cells = [f"{row[key]:>{width}.{decimals}f}" if key in row else " " * width
+                 for key, _, width, decimals in columns]
+        line = f"{row['app']:<16} " + " ".join(cells)
+        if row.get("error"):
+            line += f"  ({row['error']})"
+        print(line)
+
+
+def measure_apps(apps, root, frames, inputs_dir=None, seed=0, options=(), workers=None, timing=False):
+    """Benchmark `apps` with the counting options, after a separate timing pass if `timing`."""
+    print("[Bench] Counting pass (device estimate, draw calls, allocations)")
+    counted = run_benchmarks(apps, root, frames, inputs_dir, seed, tuple(options) + COUNTING_OPTIONS, workers)
+    if not timing:
+        return counted
+    # Tracing slows frames down, so they are timed in a pass of their own
+    print("[Bench] Timing pass")
+    rows = run_benchmarks(apps, root, frames, inputs_dir, seed, tuple(options), workers)
+    for row, extra in zip(rows, counted):
+        for key in ("device_mean", "device_p95", "calls", "allocs"):
+            if key in extra:
+                row[key] = extra[key]
+        row["error"] = row["error"] or extra["error"]
+    return rows
+
+
+def host_info():
+    """Describe this machine; host timings only compare on the same one."""
+    return {
+        "machine": platform.machine(),
+        "processor": platform.processor(),
+        "system": platform.system(),
+        "python": platform.python_version(),
+    }
+
+
+def save_baseline(path, rows, frames, seed, timing=False):
+    """Write the metrics compared by --compare for every app that ran.
+
+    With `timing`, host timings and the host they were measured on are saved too.
+    """
+    metrics = BASELINE_METRICS + TIMING_METRICS if timing else BASELINE_METRICS
+    apps = {}
+    for row in rows:
+        if "frames" not in row:
+            continue
+        entry = {key: round(row[key], 3) for key, _, _ in metrics if key in row}
+        entry["input"] = row["input"]
+        apps[row["app"]] = entry
+    data = {"version": 1, "frames": frames, "seed": seed, "apps": apps}
+    if timing:
+        data["host"] = host_info()
+    with open(path, "w", encoding="utf-8") as fh:
+        json.dump(data, fh, indent=2, sort_keys=True)
+        fh.write("\n")
+    print(f"[Bench] Baseline saved: {path} ({len(apps)} apps)")
+
+
+def load_baseline(path):
+    with open(path, "r", encoding="utf-8") as fh:
+        data = json.load(fh)
+    if data.get("version") != 1 or not isinstance(data.get("apps"), dict):
+        raise ValueError("not a bench.py baseline")
+    return data
+
+
+def compare_to_baseline(baseline, rows, threshold_pct, all_apps=True, timing=False):
+    """Print a diff table against `baseline`; return the number of regressions.
+
+    With `all_apps`, baseline apps that did not run are listed too. With
+    `timing`, host timings are compared as well when the baseline has them
+    and was saved on this host.
+    """
+    metrics = BASELINE_METRICS
+    if timing:
+        if "host" not in baseline:
+            print("[Bench] Warning: the baseline has no timings; save one with --save-baseline --timing")
+        elif baseline["host"] != host_info():
+            print("[Bench] Warning: the baseline was saved on a different host or Python; "
+                  "p95 times are not compared")
+        else:
+            metrics = BASELINE_METRICS + TIMING_METRICS
+    limit = 1.0 + threshold_pct / 100.0
+    print(f"\n[Compare] change vs baseline (regression: worse by more than {threshold_pct:g}%)")
+    print(f"{'App':<16} " + " ".join(f"{title:>10}" for _, title, _ in metrics))
+    regressions = []
+    for row in rows:
+        app = row["app"]
+        base = baseline["apps"].get(app)
+        if base is None or "frames" not in row:
+            print(f"{app:<16} " + ("new app" if "frames" in row else f"FAILED: {row['error']}"))
+            continue
+        cells = []
+        for key, title, min_delta in metrics:
+            if key not in base or key not in row:
+                cells.append(f"{'-':>10}")
+                continue
+            old, new = base[key], row[key]
+            change = (new - old) / old * 100.0 if old else (0.0 if new == old else float("inf"))
+            worse = new > old * limit and new - old >= min_delta
+            if worse:
+                regressions.append((app, title, old, new, change))
+            cells.append(f"{change:>+8.1f}%{'!' if worse else ' '}")
+        note = "  (input changed)" if base.get("input") != row["input"] else ""
+        print(f"{app:<16} " + " ".join(cells) + note)
+    if all_apps:
+        for app in sorted(set(baseline["apps"]) - {row["app"] for row in rows}):
+            print(f"{app:<16} not run")
+
+    if regressions:
+        print(f"\n[Compare] {len(regressions)} regression(s):")
+        for app, title, old, new, change in regressions:
+            print(f"  {app}: {title} {old:.2f} -> {new:.2f} ({change:+.0f}%)")
+    else:
+        print("\n[Compare] No regressions")
+    return len(regressions)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Benchmark badge apps in parallel with the simulator")
+    parser.add_argument(
+        "apps",
+        nargs="*",
+        metavar="APP",
+        help="App directory names to run (default: every app the menu lists).",
+    )
+    parser.add_argument(
+        "-C",
+        dest="system_root",
+        default=DEFAULT_ROOT,
+        metavar="DIR",
+        help="Directory to treat as /system (default: badge/ next to the simulator).",
+    )
+    parser.add_argument(
+        "--frames",
+        type=int,
+        metavar="N",
+        help="Frames to run each app for (default: 300, or the baseline's with --compare).",
+    )
+    parser.add_argument(
+        "--inputs",
+        dest="inputs_dir",
+        metavar="DIR",
+        help="Replay DIR/<app>.json (from --record) instead of the default input script when it exists.",
+    )
+    parser.add_argument(
+        "--seed",
+        type=int,
+        metavar="N",
+        help="Seed random/urandom with N in every app (default: 0, or the baseline's with --compare).",
+    )
+    parser.add_argument(
+        "-j",
+        "--jobs",
+        type=int,
+        metavar="N",
+        help="Number of worker processes (default: one per CPU).",
+    )
+    parser.add_argument(
+        "--device-estimate",
+        dest="options",
+        action="append_const",
+        const="--device-estimate",
+        help="Also estimate each app's frame time on the badge's RP2350.",
+    )
+    parser.add_argument(
+        "--profile",
+        dest="options",
+        action="append_const",
+        const="--profile",
+        help="Also count draw calls per frame.",
+    )
+    parser.add_argument(
+        "--alloc-trace",
+        dest="options",
+        action="append_const",
+        const="--alloc-trace",
+        help="Also count allocations per frame (several times slower).",
+    )
+    parser.add_argument(
+        "--http-replay",
+        dest="http_replay",
+        metavar="DIR",
+        help="Serve network apps' HTTP responses from fixtures in DIR (see the simulator's --http-record; "
+             "default with --save-baseline and --compare: simulator/http_fixtures).",
+    )
+    parser.add_argument(
+        "--json",
+        dest="json_path",
+        metavar="FILE",
+        help="Write the results to FILE as JSON.",
+    )
+    baseline_group = parser.add_mutually_exclusive_group()
+    baseline_group.add_argument(
+        "--save-baseline",
+        dest="save_baseline",
+        action="store_true",
+        help="Measure timing and counts and save them as the baseline.",
+    )
+    baseline_group.add_argument(
+        "--compare",
+        action="store_true",
+        help="Measure again and flag apps that regressed against the baseline; exit 1 if any did.",
+    )
+    parser.add_argument(
+        "--baseline",
+        dest="baseline_path",
+        default=DEFAULT_BASELINE,
+        metavar="FILE",
+        help="Baseline file for --save-baseline and --compare (default: simulator/perf_baseline.json).",
+    )
+    parser.add_argument(
+        "--timing",
+        action="store_true",
+        help="With --save-baseline or --compare, include p95 update() time (only comparable on one host).",
+    )
+    parser.add_argument(
+        "--threshold",
+        type=float,
+        default=20.0,
+        metavar="PCT",
+        help="Percentage a metric may grow before --compare flags it (default: 20).",
+    )
+    args = parser.parse_args()
+
+    root = os.path.abspath(args.system_root)
+    if not os.path.isdir(os.path.join(root, "apps")):
+        print(f"System root '{args.system_root}' has no apps directory.", file=sys.stderr)
+        sys.exit(2)
+    apps = args.apps or discover_apps(root)
+    unknown = [app for app in apps if not os.path.isfile(os.path.join(root, "apps", app, "__init__.py"))]
+    if unknown:
+        print(f"Unknown app(s): {', '.join(unknown)}", file=sys.stderr)
+        sys.exit(2)
+
+    inputs_dir = args.inputs_dir
+    frames, seed = args.frames, args.seed
+    baseline = None
+    if args.compare:
+        try:
+            baseline = load_baseline(args.baseline_path)
+        except (OSError, ValueError) as e:
+            print(f"Could not load baseline '{args.baseline_path}': {e}", file=sys.stderr)
+            sys.exit(2)
+        # Rerun under the same conditions the baseline was measured in
+        frames = frames if frames is not None else baseline["frames"]
+        seed = seed if seed is not None else baseline["seed"]
+        if (frames, seed) != (baseline["frames"], baseline["seed"]):
+            print(f"[Bench] Warning: the baseline ran {baseline['frames']} frames with seed {baseline['seed']}")
+    frames = frames if frames is not None else 300
+    seed = seed if seed is not None else 0
+
+    http_replay = args.http_replay
+    if http_replay is None and (args.save_baseline or baseline is not None):
+        # A live response (or its absence) would change what network apps do from host to host
+        http_replay = DEFAULT_HTTP_FIXTURES
+    network = ("--http-replay", os.path.abspath(http_replay)) if http_replay else ()
+    start = time.perf_counter()
+    if args.save_baseline or baseline is not None:
+        rows = measure_apps(apps, root, frames, inputs_dir, seed, network, args.jobs, timing=args.timing)
+    else:
+        rows = run_benchmarks(apps, root, frames, inputs_dir=inputs_dir, seed=seed,
+                              options=tuple(args.options or ()) + network, workers=args.jobs)
+    if baseline is None:
+        print_table(rows)
+    print(f"\n[Bench] {len(rows)} apps in {time.perf_counter() - start:.1f}s")
+
+    if args.json_path:
+        with open(args.json_path, "w", encoding="utf-8") as fh:
+            json.dump({"frames": frames, "seed": seed, "apps": rows}, fh, indent=2)
+        print(f"[Bench] Results written to {args.json_path}")
+    if args.save_baseline:
+        save_baseline(args.baseline_path, rows, frames, seed, timing=args.timing)
+    if baseline is not None:
+        if compare_to_baseline(baseline, rows, args.threshold, all_apps=not args.apps, timing=args.timing):
+            sys.exit(1)
+    if any(row.get("error") for row in rows):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()